@@ -1,5 +1,14 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from . import db  # noqa: F401
+
+        if settings.TEMPLATE_WARMUP:
+            from .warmup import warm_up_templates
+
+            warm_up_templates()
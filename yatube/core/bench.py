@@ -0,0 +1,59 @@
+"""Общие помощники для команд замера производительности."""
+import math
+import time
+from contextlib import contextmanager
+
+from django.db import transaction
+
+
+class Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rolled_back():
+    """Выполняет блок в транзакции и откатывает всё, что он записал."""
+    try:
+        with transaction.atomic():
+            yield
+            raise Rollback
+    except Rollback:
+        pass
+
+
+def percentile(values, percent):
+    """Перцентиль методом ближайшего ранга."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(latencies):
+    """Сводка по задержкам в миллисекундах."""
+    return {
+        'count': len(latencies),
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        'max': max(latencies, default=0.0),
+    }
+
+
+def format_summary(name, summary):
+    return (
+        f'{name:<40} n={summary["count"]:<6} '
+        f'p50={summary["p50"]:8.2f} мс  p95={summary["p95"]:8.2f} мс  '
+        f'p99={summary["p99"]:8.2f} мс'
+    )
+
+
+@contextmanager
+def timer(results):
+    """Добавляет длительность блока в миллисекундах в список results."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        results.append((time.perf_counter() - start) * 1000)
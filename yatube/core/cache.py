@@ -0,0 +1,48 @@
+import os
+import tempfile
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.files import locks
+from django.core.cache.backends.filebased import (
+    FileBasedCache as BaseFileBasedCache,
+)
+
+
+class FileBasedCache(BaseFileBasedCache):
+    """Файловый кэш с атомарными add и incr.
+
+    Штатный add сначала проверяет файл, потом пишет его, и два процесса
+    могут оба «взять» одну блокировку. Здесь значение пишется во
+    временный файл и появляется под своим именем через os.link, который
+    не перезаписывает существующий файл.
+
+    Штатный incr — это get и set, и одновременные увеличения теряются.
+    Здесь они идут под общей файловой блокировкой каталога кэша.
+    """
+
+    lock_name = 'incr.lock'
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        if self.has_key(key, version):
+            return False
+        self._createdir()
+        fname = self._key_to_file(key, version)
+        fd, tmp_path = tempfile.mkstemp(dir=self._dir)
+        try:
+            with open(fd, 'wb') as f:
+                self._write_content(f, timeout, value)
+            os.link(tmp_path, fname)
+        except FileExistsError:
+            return False
+        finally:
+            os.remove(tmp_path)
+        return True
+
+    def incr(self, key, delta=1, version=None):
+        self._createdir()
+        with open(os.path.join(self._dir, self.lock_name), 'a') as lock:
+            locks.lock(lock, locks.LOCK_EX)
+            try:
+                return super().incr(key, delta, version)
+            finally:
+                locks.unlock(lock)
@@ -0,0 +1,19 @@
+"""Настройка соединений SQLite под конкурентную нагрузку.
+
+При открытии каждого соединения применяются PRAGMA из
+settings.SQLITE_PRAGMAS: журнал WAL позволяет читателям не ждать
+писателя, busy_timeout заставляет писателей ждать блокировку вместо
+мгновенной ошибки «database is locked».
+"""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def tune_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
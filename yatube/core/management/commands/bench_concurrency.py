@@ -0,0 +1,114 @@
+import itertools
+import threading
+import time
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections
+from django.test import Client
+from django.urls import reverse
+
+from core.bench import format_summary, summarize, timer
+from posts.models import Group, Post
+
+User = get_user_model()
+
+BENCH_USERNAME = 'bench-writer'
+
+
+class Command(BaseCommand):
+    help = (
+        'Гоняет параллельных читателей и писателей по страницам posts '
+        'и показывает задержки и ошибки блокировок. Пишет в базу, '
+        'поэтому запускайте на копии (SQLITE_PATH).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument(
+            '--seconds', type=float, default=10,
+            help='Длительность прогона.',
+        )
+
+    def prepare(self):
+        writer, _ = User.objects.get_or_create(username=BENCH_USERNAME)
+        group, _ = Group.objects.get_or_create(
+            slug='bench', defaults={'title': 'bench', 'description': ''}
+        )
+        post = Post.objects.filter(group=group).first() or (
+            Post.objects.create(author=writer, group=group, text='bench')
+        )
+        return writer, group, post
+
+    def read_urls(self, writer, group, post):
+        return [
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': group.slug}),
+            reverse('posts:profile', kwargs={'username': writer.username}),
+            reverse('posts:post_detail', kwargs={'post_id': post.pk}),
+        ]
+
+    def worker(self, deadline, action, results, errors, user=None):
+        client = Client()
+        try:
+            if user is not None:
+                client.force_login(user)
+            while time.monotonic() < deadline:
+                name, request = action(client)
+                try:
+                    with timer(results[name]):
+                        request()
+                except OperationalError as error:
+                    errors[str(error)] += 1
+        finally:
+            connections.close_all()
+
+    def handle(self, *args, **options):
+        writer, group, post = self.prepare()
+        urls = self.read_urls(writer, group, post)
+        comment_url = reverse('posts:add_comment', kwargs={'post_id': post.pk})
+        create_url = reverse('posts:post_create')
+        results = defaultdict(list)
+        errors = defaultdict(int)
+
+        def reader(client, counter=itertools.count()):
+            url = urls[next(counter) % len(urls)]
+            return f'GET {url}', lambda: client.get(url)
+
+        def writer_action(client, counter=itertools.count()):
+            if next(counter) % 2:
+                return f'POST {comment_url}', lambda: client.post(
+                    comment_url, {'text': 'bench comment'})
+            return f'POST {create_url}', lambda: client.post(
+                create_url, {'text': 'bench post', 'group': group.pk})
+
+        deadline = time.monotonic() + options['seconds']
+        threads = [
+            threading.Thread(
+                target=self.worker,
+                args=(deadline, action, results, errors, user),
+            )
+            for action, count, user in (
+                (reader, options['readers'], None),
+                (writer_action, options['writers'], writer),
+            )
+            for _ in range(count)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        total = sum(len(values) for values in results.values())
+        for name, latencies in sorted(results.items()):
+            self.stdout.write(format_summary(name, summarize(latencies)))
+        self.stdout.write(
+            f'Запросов: {total}, '
+            f'в секунду: {total / options["seconds"]:.1f}'
+        )
+        for message, count in errors.items():
+            self.stdout.write(self.style.ERROR(f'{message}: {count}'))
+        if not errors:
+            self.stdout.write(self.style.SUCCESS('Ошибок блокировок нет'))
@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.bench import format_summary, summarize
+
+PROFILES = ('yatube.settings.dev', 'yatube.settings.prod')
+WSGI_IMPORT = (
+    'import time; started = time.perf_counter(); '
+    'from yatube.wsgi import application; '
+    'print((time.perf_counter() - started) * 1000)'
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет время manage.py check и импорта WSGI-приложения '
+        'в отдельных процессах для каждого профиля настроек.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument(
+            '--profiles', nargs='+', default=list(PROFILES),
+            help='Модули настроек для сравнения.',
+        )
+
+    def run(self, args, profile):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': profile}
+        result = subprocess.run(
+            [sys.executable, *args], cwd=settings.BASE_DIR, env=env,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+        )
+        if result.returncode:
+            raise CommandError(f'{profile}: {result.stderr.strip()}')
+        return result.stdout
+
+    def handle(self, *args, **options):
+        for profile in options['profiles']:
+            check, wsgi = [], []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                self.run(['manage.py', 'check'], profile)
+                check.append((time.perf_counter() - started) * 1000)
+                output = self.run(['-c', WSGI_IMPORT], profile)
+                wsgi.append(float(output.strip().splitlines()[-1]))
+            self.stdout.write(
+                format_summary(f'{profile} manage.py check', summarize(check))
+            )
+            self.stdout.write(
+                format_summary(f'{profile} импорт WSGI', summarize(wsgi))
+            )
@@ -0,0 +1,123 @@
+import json
+import statistics
+from importlib import import_module
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.bench import format_summary, rolled_back, summarize, timer
+from posts.models import Post
+
+URLCONFS = ('posts.urls', 'users.urls', 'about.urls')
+# Адрес вне INTERNAL_IPS, чтобы debug_toolbar не встраивался в ответы.
+REMOTE_ADDR = '10.0.0.1'
+
+
+def targets(kwargs):
+    """Имена и адреса всех маршрутов приложений с подставленными
+    параметрами."""
+    for module in URLCONFS:
+        urlconf = import_module(module)
+        for pattern in urlconf.urlpatterns:
+            name = f'{urlconf.app_name}:{pattern.name}'
+            params = {key: kwargs[key] for key in pattern.pattern.converters}
+            yield name, reverse(name, kwargs=params)
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогоняет все адреса posts, users и about через тестовый клиент, '
+        'показывает p50/p95/p99 и число запросов к базе, умеет сохранять '
+        'и сравнивать базовую линию. Записи откатываются после прогона.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=30)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--save', help='Сохранить результат в JSON.')
+        parser.add_argument(
+            '--compare', help='Сравнить с сохранённой базовой линией.',
+        )
+        parser.add_argument(
+            '--threshold', type=float, default=10,
+            help='Допустимый рост p95 в процентах.',
+        )
+
+    def prepare(self):
+        post = (
+            Post.objects.select_related('author', 'group')
+            .filter(group__isnull=False).order_by('-pk').first()
+        )
+        if post is None:
+            raise CommandError(
+                'Нет постов с группой: сначала запустите seed_yatube.'
+            )
+        return post.author, {
+            'post_id': post.pk,
+            'username': post.author.username,
+            'slug': post.group.slug,
+        }
+
+    def measure(self, user, url, options):
+        client = Client(REMOTE_ADDR=REMOTE_ADDR)
+        latencies, queries = [], []
+        for number in range(options['warmup'] + options['requests']):
+            # Вход перед каждым запросом: logout разлогинивает клиента.
+            client.force_login(user)
+            sample = [] if number < options['warmup'] else latencies
+            with CaptureQueriesContext(connection) as captured:
+                with timer(sample):
+                    client.get(url)
+            if sample is latencies:
+                queries.append(len(captured))
+        summary = summarize(latencies)
+        summary['queries'] = statistics.median(queries)
+        return summary
+
+    def handle(self, *args, **options):
+        results = {}
+        with rolled_back():
+            user, kwargs = self.prepare()
+            for name, url in targets(kwargs):
+                results[name] = self.measure(user, url, options)
+                self.stdout.write(
+                    f'{format_summary(name, results[name])}  '
+                    f'запросов к БД: {results[name]["queries"]:g}'
+                )
+        if options['save']:
+            with open(options['save'], 'w') as file:
+                json.dump(results, file, indent=2, ensure_ascii=False)
+            self.stdout.write(f'Сохранено в {options["save"]}')
+        if options['compare']:
+            self.compare(results, options['compare'], options['threshold'])
+
+    def compare(self, results, path, threshold):
+        with open(path) as file:
+            baseline = json.load(file)
+        regressions = []
+        for name, current in results.items():
+            before = baseline.get(name)
+            if before is None:
+                self.stdout.write(f'{name}: нет в базовой линии')
+                continue
+            change = (
+                (current['p95'] - before['p95']) / before['p95'] * 100
+                if before['p95'] else 0
+            )
+            queries = current['queries'] - before['queries']
+            line = (
+                f'{name:<40} p95 {before["p95"]:8.2f} -> '
+                f'{current["p95"]:8.2f} мс ({change:+.0f}%), '
+                f'запросов {queries:+g}'
+            )
+            if change > threshold or queries > 0:
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+        if regressions:
+            raise CommandError(f'Регрессии: {", ".join(regressions)}')
+        self.stdout.write(self.style.SUCCESS('Регрессий нет'))
@@ -0,0 +1,27 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в файлы реплик. Локальная замена '
+        'настоящей репликации для проверки core.routers.'
+    )
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError(
+                'Реплики не настроены: задайте SQLITE_REPLICA_PATH.'
+            )
+        primary = connections['default']
+        primary.ensure_connection()
+        for alias in settings.DATABASE_REPLICAS:
+            replica = sqlite3.connect(connections[alias].settings_dict['NAME'])
+            try:
+                primary.connection.backup(replica)
+            finally:
+                replica.close()
+            self.stdout.write(self.style.SUCCESS(f'{alias}: скопировано'))
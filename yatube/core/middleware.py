@@ -0,0 +1,90 @@
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import performance, routers
+
+logger = logging.getLogger('yatube.performance')
+
+STICKY_COOKIE = 'primary_until'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+class ReplicaRoutingMiddleware:
+    """Прижимает чтение к основной базе для пишущих запросов
+    и на короткое время после них."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        routers.reset()
+        if (request.method in SAFE_METHODS
+                and not self.recently_wrote(request)):
+            routers.allow_replicas()
+        try:
+            response = self.get_response(request)
+            if routers.has_written():
+                until = time.time() + settings.REPLICA_STICKY_SECONDS
+                response.set_cookie(
+                    STICKY_COOKIE,
+                    f'{until:.3f}',
+                    max_age=settings.REPLICA_STICKY_SECONDS,
+                    httponly=True,
+                )
+        finally:
+            routers.reset()
+        return response
+
+    def recently_wrote(self, request):
+        try:
+            return float(request.COOKIES.get(STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+
+class PerformanceMiddleware:
+    """Считает запросы к базе, рендер шаблонов и попадания в кэш.
+
+    Итог уходит в заголовок Server-Timing и в JSON-строку лога
+    yatube.performance: для доли PERFORMANCE_SAMPLE_RATE запросов
+    и для всех медленнее PERFORMANCE_SLOW_MS.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PERFORMANCE_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics, token = performance.start()
+        try:
+            with ExitStack() as stack:
+                timer = performance.QueryTimer(metrics)
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timer))
+                response = self.get_response(request)
+        finally:
+            performance.stop(token)
+        total_ms = metrics.total_ms
+        if settings.PERFORMANCE_SERVER_TIMING:
+            response['Server-Timing'] = performance.server_timing(
+                metrics, total_ms
+            )
+        slow = total_ms >= settings.PERFORMANCE_SLOW_MS
+        if slow or random.random() < settings.PERFORMANCE_SAMPLE_RATE:
+            record = performance.as_record(
+                metrics, total_ms, request, response
+            )
+            record['slow'] = slow
+            logger.log(
+                logging.WARNING if slow else logging.INFO,
+                json.dumps(record, ensure_ascii=False),
+            )
+        return response
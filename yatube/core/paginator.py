@@ -0,0 +1,67 @@
+"""Пагинатор списков админки для больших таблиц.
+
+Точный COUNT(*) по таблице в миллионы строк читает её целиком на каждой
+странице списка. Для списка без фильтров число строк берётся из оценки
+СУБД, а точный подсчёт остаётся для отфильтрованных выборок, которые
+обычно гораздо уже.
+"""
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+ESTIMATE_QUERIES = {
+    # Статистика планировщика, обновляется autovacuum и ANALYZE.
+    'postgresql': 'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+    # Наибольший rowid берётся из индекса; удаления оценку завышают.
+    'sqlite': 'SELECT MAX(rowid) FROM "{table}"',
+}
+
+
+def estimate_count(queryset):
+    """Оценка числа строк таблицы модели или None, если её нет."""
+    connection = connections[queryset.db]
+    sql = ESTIMATE_QUERIES.get(connection.vendor)
+    if sql is None:
+        return None
+    table = queryset.model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(sql.format(table=table))
+        else:
+            cursor.execute(sql, [table])
+        row = cursor.fetchone()
+    return row[0] if row and row[0] is not None else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Берёт оценку числа строк, если выборка не отфильтрована
+    и таблица больше ADMIN_ESTIMATED_COUNT_THRESHOLD строк.
+
+    Оценка бывает завышена (на SQLite после любых удалений), и хвостовые
+    страницы по ней оказываются пустыми. Запрос такой страницы переводит
+    пагинатор на точный подсчёт и отдаёт последнюю настоящую страницу.
+    """
+
+    estimated = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimate_count(queryset)
+            if (estimate is not None
+                    and estimate >= settings.ADMIN_ESTIMATED_COUNT_THRESHOLD):
+                self.estimated = True
+                return estimate
+        return super().count
+
+    def page(self, number):
+        number = self.validate_number(number)
+        page = super().page(number)
+        if not self.estimated or page.object_list:
+            return page
+        self.estimated = False
+        self.__dict__.pop('num_pages', None)
+        self.__dict__['count'] = Paginator.count.func(self)
+        return super().page(min(number, self.num_pages))
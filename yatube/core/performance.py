@@ -0,0 +1,104 @@
+"""Замеры производительности одного запроса.
+
+Метрики копятся в contextvar: шаблонный бэкенд и кэш лент дописывают
+их, ничего не зная о middleware, а вне запроса запись просто пропускается.
+"""
+import contextvars
+import time
+from contextlib import contextmanager
+
+_metrics = contextvars.ContextVar('performance_metrics', default=None)
+
+
+class Metrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_ms = 0.0
+        self.template_ms = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._depth = 0
+
+    @property
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+
+def start():
+    metrics = Metrics()
+    return metrics, _metrics.set(metrics)
+
+
+def stop(token):
+    _metrics.reset(token)
+
+
+def current():
+    return _metrics.get()
+
+
+def record_cache(hit):
+    metrics = _metrics.get()
+    if metrics is None:
+        return
+    if hit:
+        metrics.cache_hits += 1
+    else:
+        metrics.cache_misses += 1
+
+
+@contextmanager
+def timed_template():
+    """Считает время рендера; вложенные рендеры не складываются дважды."""
+    metrics = _metrics.get()
+    if metrics is None or metrics._depth:
+        yield
+        return
+    metrics._depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.template_ms += (time.perf_counter() - started) * 1000
+        metrics._depth -= 1
+
+
+class QueryTimer:
+    """Обёртка connection.execute_wrapper: число и время запросов."""
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.metrics.queries += 1
+            self.metrics.db_ms += (time.perf_counter() - started) * 1000
+
+
+def server_timing(metrics, total_ms):
+    return ', '.join((
+        f'db;dur={metrics.db_ms:.1f};desc="{metrics.queries} queries"',
+        f'tpl;dur={metrics.template_ms:.1f}',
+        f'cache;desc="hit={metrics.cache_hits} miss={metrics.cache_misses}"',
+        f'total;dur={total_ms:.1f}',
+    ))
+
+
+def as_record(metrics, total_ms, request, response):
+    match = request.resolver_match
+    return {
+        'view': match.view_name if match else None,
+        'method': request.method,
+        'path': request.path,
+        'status': response.status_code,
+        'duration_ms': round(total_ms, 2),
+        'db_queries': metrics.queries,
+        'db_ms': round(metrics.db_ms, 2),
+        'template_ms': round(metrics.template_ms, 2),
+        'cache_hits': metrics.cache_hits,
+        'cache_misses': metrics.cache_misses,
+    }
@@ -0,0 +1,71 @@
+"""Маршрутизация запросов ORM между основной базой и репликами.
+
+Запись всегда идёт в default. Чтение уходит на одну из
+settings.DATABASE_REPLICAS только внутри читающих HTTP-запросов:
+core.middleware.ReplicaRoutingMiddleware разрешает реплики для
+безопасных методов, если клиент не писал в базу последние
+REPLICA_STICKY_SECONDS (read-your-writes). Миграции, команды
+и пишущие view читают из default.
+"""
+import random
+import threading
+from functools import wraps
+
+from django.conf import settings
+
+PRIMARY = 'default'
+# Таблица DatabaseCache живёт только в основной базе.
+CACHE_APP_LABEL = 'django_cache'
+
+_state = threading.local()
+
+
+def allow_replicas():
+    _state.use_replicas = True
+
+
+def pin_primary():
+    _state.use_replicas = False
+
+
+def reset():
+    _state.use_replicas = False
+    _state.wrote = False
+
+
+def is_pinned():
+    return not getattr(_state, 'use_replicas', False)
+
+
+def has_written():
+    return getattr(_state, 'wrote', False)
+
+
+def use_primary(view_func):
+    """Декоратор пишущих view: всё чтение внутри идёт в default."""
+    @wraps(view_func)
+    def wrapper(*args, **kwargs):
+        pin_primary()
+        return view_func(*args, **kwargs)
+    return wrapper
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if (not replicas or is_pinned()
+                or model._meta.app_label == CACHE_APP_LABEL):
+            return PRIMARY
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label != CACHE_APP_LABEL:
+            _state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и основная база.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return True
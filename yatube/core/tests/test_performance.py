@@ -0,0 +1,45 @@
+import json
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+
+@override_settings(PERFORMANCE_SAMPLE_RATE=1, PERFORMANCE_SLOW_MS=10 ** 6)
+class PerformanceMiddlewareTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def get_record(self, url):
+        with self.assertLogs('yatube.performance', 'INFO') as logs:
+            response = self.client.get(url)
+        return response, json.loads(logs.records[-1].getMessage())
+
+    def test_record_and_header(self):
+        """Запрос попадает в лог и получает заголовок Server-Timing."""
+        response, record = self.get_record(reverse('posts:index'))
+        self.assertEqual(record['view'], 'posts:index')
+        self.assertEqual(record['status'], 200)
+        self.assertGreater(record['db_queries'], 0)
+        self.assertGreater(record['template_ms'], 0)
+        self.assertEqual(record['cache_misses'], 1)
+        self.assertFalse(record['slow'])
+        # В записи db_ms округлено до сотых, в заголовке — до десятых.
+        self.assertRegex(
+            response['Server-Timing'],
+            rf'db;dur=\d+\.\d;desc="{record["db_queries"]} queries"',
+        )
+
+    def test_cache_hits_are_counted(self):
+        """Повторная страница ленты отдаётся из кэша."""
+        self.get_record(reverse('posts:index'))
+        _, record = self.get_record(reverse('posts:index'))
+        self.assertEqual(record['cache_hits'], 1)
+        self.assertEqual(record['cache_misses'], 0)
+
+    @override_settings(PERFORMANCE_SAMPLE_RATE=0, PERFORMANCE_SLOW_MS=0)
+    def test_slow_requests_always_logged(self):
+        """Медленные запросы пишутся предупреждением и без сэмплирования."""
+        with self.assertLogs('yatube.performance', 'WARNING') as logs:
+            self.client.get(reverse('about:author'))
+        self.assertTrue(json.loads(logs.records[0].getMessage())['slow'])
@@ -0,0 +1,82 @@
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core import routers
+from core.middleware import STICKY_COOKIE, ReplicaRoutingMiddleware
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], REPLICA_STICKY_SECONDS=5)
+class PrimaryReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        self.router = routers.PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+        self.seen = []
+
+    def tearDown(self):
+        routers.reset()
+
+    def view(self, write=False):
+        def get_response(request):
+            self.seen.append(self.router.db_for_read(User))
+            if write:
+                self.router.db_for_write(User)
+            return HttpResponse()
+        return ReplicaRoutingMiddleware(get_response)
+
+    def test_reads_go_to_replica_and_writes_to_primary(self):
+        self.view(write=True)(self.factory.get('/'))
+        self.assertEqual(self.seen, ['replica'])
+        self.assertEqual(self.router.db_for_write(User), 'default')
+
+    def test_reads_outside_requests_go_to_primary(self):
+        """Миграции и команды читают из основной базы."""
+        self.assertEqual(self.router.db_for_read(User), 'default')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas_everything_goes_to_primary(self):
+        self.view()(self.factory.get('/'))
+        self.assertEqual(self.seen, ['default'])
+
+    def test_unsafe_methods_read_from_primary(self):
+        self.view()(self.factory.post('/'))
+        self.view()(self.factory.get('/'))
+        self.assertEqual(self.seen, ['default', 'replica'])
+
+    def test_read_your_writes_after_write(self):
+        """После записи клиент какое-то время читает из основной базы."""
+        response = self.view(write=True)(self.factory.get('/follow/'))
+        self.assertIn(STICKY_COOKIE, response.cookies)
+        request = self.factory.get('/')
+        request.COOKIES[STICKY_COOKIE] = response.cookies[STICKY_COOKIE].value
+        self.view()(request)
+        self.assertEqual(self.seen, ['replica', 'default'])
+
+    def test_expired_or_broken_cookie_is_ignored(self):
+        for value in ('1', 'garbage'):
+            with self.subTest(value=value):
+                request = self.factory.get('/')
+                request.COOKIES[STICKY_COOKIE] = value
+                self.view()(request)
+        self.assertEqual(self.seen, ['replica', 'replica'])
+
+    def test_write_views_are_pinned(self):
+        """Декоратор use_primary отправляет чтение view в основную базу."""
+        @routers.use_primary
+        def view(request):
+            self.seen.append(self.router.db_for_read(User))
+            return HttpResponse()
+
+        ReplicaRoutingMiddleware(view)(self.factory.get('/'))
+        self.assertEqual(self.seen, ['default'])
+
+    def test_cache_table_stays_on_primary(self):
+        from django.core.cache.backends.db import BaseDatabaseCache
+
+        cache_model = BaseDatabaseCache('cache_table', {}).cache_model_class
+        routers.allow_replicas()
+        self.assertEqual(self.router.db_for_read(cache_model), 'default')
+        self.router.db_for_write(cache_model)
+        self.assertFalse(routers.has_written())
@@ -0,0 +1,22 @@
+import importlib
+
+from django.test import SimpleTestCase
+
+
+class SettingsProfilesTest(SimpleTestCase):
+    def test_prod_profile_is_lean(self):
+        """В prod нет панели отладки и локального кэша процесса."""
+        prod = importlib.import_module('yatube.settings.prod')
+        self.assertFalse(prod.DEBUG)
+        self.assertNotIn('debug_toolbar', prod.INSTALLED_APPS)
+        self.assertFalse(
+            any('debug_toolbar' in name for name in prod.MIDDLEWARE)
+        )
+        self.assertNotIn('locmem', prod.CACHES['default']['BACKEND'])
+        self.assertTrue(prod.TEMPLATE_WARMUP)
+
+    def test_dev_profile_is_default(self):
+        """Пакет yatube.settings отдаёт профиль dev."""
+        settings = importlib.import_module('yatube.settings')
+        self.assertTrue(settings.DEBUG)
+        self.assertIn('debug_toolbar', settings.INSTALLED_APPS)
@@ -0,0 +1,31 @@
+import copy
+
+from django.conf import settings
+from django.template import engines
+from django.test import SimpleTestCase, override_settings
+
+from core.warmup import template_names, warm_up_templates
+
+CACHED_TEMPLATES = copy.deepcopy(settings.TEMPLATES)
+CACHED_TEMPLATES[0]['APP_DIRS'] = False
+CACHED_TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+
+@override_settings(TEMPLATES=CACHED_TEMPLATES)
+class TemplateWarmUpTest(SimpleTestCase):
+    def test_all_project_templates_are_cached(self):
+        """Прогрев кладёт в кэш загрузчика все шаблоны проекта."""
+        with self.assertLogs('yatube.performance', 'INFO'):
+            compiled, elapsed = warm_up_templates()
+        names = list(template_names(settings.TEMPLATES_DIR))
+        self.assertEqual(compiled, len(names))
+        self.assertGreater(elapsed, 0)
+        loader = engines.all()[0].engine.template_loaders[0]
+        for name in ('base.html', 'posts/includes/paginator.html'):
+            with self.subTest(name=name):
+                self.assertIn(name, loader.get_template_cache)
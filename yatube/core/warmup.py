@@ -0,0 +1,38 @@
+"""Прогрев кэшированного загрузчика шаблонов при старте процесса."""
+import logging
+import os
+import time
+
+from django.template import TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+
+logger = logging.getLogger('yatube.performance')
+
+
+def template_names(directory):
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if name.endswith(('.html', '.txt')):
+                path = os.path.join(root, name)
+                yield os.path.relpath(path, directory).replace(os.sep, '/')
+
+
+def warm_up_templates():
+    """Компилирует все шаблоны из DIRS, чтобы кэш загрузчика был полон
+    до первых запросов. Возвращает (число шаблонов, миллисекунды)."""
+    started = time.perf_counter()
+    compiled = 0
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        for directory in backend.engine.dirs:
+            for name in template_names(directory):
+                try:
+                    backend.get_template(name)
+                except TemplateSyntaxError:
+                    logger.exception('Шаблон %s не компилируется', name)
+                    continue
+                compiled += 1
+    elapsed = (time.perf_counter() - started) * 1000
+    logger.info('Прогрев шаблонов: %d за %.1f мс', compiled, elapsed)
+    return compiled, elapsed
@@ -1,13 +1,213 @@
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin import helpers
+from django.contrib.admin.models import DELETION, LogEntry
+from django.contrib.contenttypes.models import ContentType
+from django.db import models, transaction
+from django.http import StreamingHttpResponse
+from django.template.response import TemplateResponse
+from django.utils import timezone
 
+from core.paginator import EstimatedCountPaginator
+from . import cache, counters, export, search
+from .forms import RegroupForm
 from .models import Group, Post, Comment, Follow
 
 
+def _streaming_export(format_, content_type):
+    def action(modeladmin, request, queryset):
+        _, fields, _ = export.EXPORTS[queryset.model._meta.model_name]
+        response = StreamingHttpResponse(
+            export.lines(export.model_rows(queryset), fields, format_),
+            content_type=content_type,
+        )
+        name = queryset.model._meta.model_name
+        response['Content-Disposition'] = (
+            f'attachment; filename="{name}.{format_}"'
+        )
+        return response
+
+    action.__name__ = f'export_{format_}'
+    action.short_description = f'Выгрузить выбранное в {format_.upper()}'
+    return action
+
+
+# Ответ отдаётся по мере чтения пачек, не собирая выгрузку в памяти.
+export_jsonl = _streaming_export('jsonl', 'application/x-ndjson')
+export_csv = _streaming_export('csv', 'text/csv; charset=utf-8')
+
+
+def _chunks(queryset):
+    """Первичные ключи выборки пачками по ADMIN_ACTION_CHUNK_SIZE.
+
+    Каждая пачка читается отдельным запросом от последнего ключа,
+    поэтому выборка не держит открытый курсор, пока её строки меняются.
+    """
+    size = settings.ADMIN_ACTION_CHUNK_SIZE
+    pks = queryset.order_by('pk').values_list('pk', flat=True)
+    chunk = list(pks[:size])
+    while chunk:
+        yield chunk
+        chunk = list(pks.filter(pk__gt=chunk[-1])[:size])
+
+
+def _cascades(model, path=(), seen=()):
+    """Модели, которые удаление model заберёт каскадом, и пути к ним.
+
+    Путь — поля внешних ключей от связанной модели до model, из него
+    складывается фильтр связанных строк без загрузки самих объектов.
+    """
+    for relation in model._meta.related_objects:
+        related = relation.related_model
+        if relation.on_delete is not models.CASCADE or related in seen:
+            continue
+        related_path = (relation.field.name, *path)
+        yield related, '__'.join(related_path)
+        yield from _cascades(related, related_path, (*seen, model))
+
+
+def forbidden_cascades(modeladmin, request, queryset):
+    """Связанные объекты, которые пользователь не вправе удалять.
+
+    Как и delete_selected, проверяет только модели из админки и только
+    те, чьи строки выборка действительно затронет.
+    """
+    forbidden = []
+    for model, lookup in _cascades(queryset.model):
+        related_admin = modeladmin.admin_site._registry.get(model)
+        if (related_admin is None
+                or related_admin.has_delete_permission(request)):
+            continue
+        if model._default_manager.filter(
+                **{f'{lookup}__in': queryset.values('pk')}).exists():
+            forbidden.append(model._meta.verbose_name_plural)
+    return forbidden
+
+
+def _log_deletions(request, objects):
+    """Записи журнала админки, как у log_deletion, одной вставкой."""
+    if not objects:
+        return
+    content_type = ContentType.objects.get_for_model(objects[0])
+    LogEntry.objects.bulk_create(
+        LogEntry(
+            user_id=request.user.pk,
+            content_type=content_type,
+            object_id=str(obj.pk),
+            object_repr=str(obj)[:200],
+            action_flag=DELETION,
+        )
+        for obj in objects
+    )
+
+
+def _confirmation_context(modeladmin, request, queryset, title):
+    return {
+        **modeladmin.admin_site.each_context(request),
+        'title': title,
+        'opts': modeladmin.model._meta,
+        'count': queryset.count(),
+        'selected': request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+        'select_across': request.POST.get('select_across', '0'),
+        'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+    }
+
+
+def delete_in_chunks(modeladmin, request, queryset):
+    """Удаляет выбранное пачками, не собирая все объекты в памяти."""
+    forbidden = forbidden_cascades(modeladmin, request, queryset)
+    if request.POST.get('post') != 'yes' or forbidden:
+        context = {
+            **_confirmation_context(
+                modeladmin, request, queryset, 'Удаление пачками'
+            ),
+            'perms_needed': forbidden,
+        }
+        return TemplateResponse(
+            request, 'admin/posts/delete_in_chunks.html', context
+        )
+    deleted = 0
+    for chunk in _chunks(queryset):
+        # Удаление идёт через ORM: сигналы поправят счётчики и кэши.
+        with transaction.atomic():
+            objects = list(modeladmin.model.objects.filter(pk__in=chunk))
+            _log_deletions(request, objects)
+            _, per_model = modeladmin.model.objects.filter(
+                pk__in=chunk).delete()
+        deleted += per_model.get(modeladmin.model._meta.label, 0)
+    modeladmin.message_user(request, f'Удалено записей: {deleted}')
+
+
+delete_in_chunks.allowed_permissions = ('delete',)
+delete_in_chunks.short_description = 'Удалить выбранное пачками'
+
+
+def regroup_posts(queryset, group):
+    """Переносит посты в группу пачками, возвращает число перенесённых.
+
+    update() обходит сигналы, поэтому счётчики затронутых групп
+    и кэши лент приводятся в порядок после переноса.
+    """
+    moved, groups, authors = 0, {getattr(group, 'pk', None)}, set()
+    for chunk in _chunks(queryset.exclude(group=group)):
+        with transaction.atomic():
+            posts = Post.objects.filter(pk__in=chunk)
+            for group_id, author_id in posts.values_list(
+                    'group_id', 'author_id'):
+                groups.add(group_id)
+                authors.add(author_id)
+            moved += posts.update(group=group, updated_at=timezone.now())
+    groups.discard(None)
+    counters.refresh_groups(groups)
+    cache.bump_version('index')
+    cache.bump_version(cache.GROUP_DIRECTORY)
+    cache.bump_author_feeds(authors)
+    return moved
+
+
+def regroup(modeladmin, request, queryset):
+    """Переносит выбранные посты в группу, выбранную на отдельной странице.
+
+    Группы не превращаются в отдельные действия: при сотнях групп
+    список действий стал бы непригодным.
+    """
+    form = RegroupForm(request.POST if 'apply' in request.POST else None)
+    if form.is_valid():
+        moved = regroup_posts(queryset, form.cleaned_data['group'])
+        modeladmin.message_user(request, f'Перенесено постов: {moved}')
+        return None
+    context = {
+        **_confirmation_context(
+            modeladmin, request, queryset, 'Перенос в группу'
+        ),
+        'form': form,
+    }
+    return TemplateResponse(request, 'admin/posts/regroup.html', context)
+
+
+regroup.allowed_permissions = ('change',)
+regroup.short_description = 'Перенести выбранные посты в группу'
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Список без точного COUNT(*) и с удалением пачками."""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        if self.has_delete_permission(request):
+            actions['delete_in_chunks'] = self.get_action(delete_in_chunks)
+        return actions
+
+
 class GroupAdmin(admin.ModelAdmin):
     list_display = ('title', 'slug', 'description')
+    actions = (export_jsonl, export_csv)
 
 
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(LargeTableAdmin):
     list_display = (
         'pk',
         'text',
@@ -16,12 +216,33 @@ class PostAdmin(admin.ModelAdmin):
         'group',
     )
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
+    autocomplete_fields = ('author',)
     search_fields = ('text',)
     list_filter = ('pub_date',)
+    # Идёт по индексу post_pub_date_id_idx.
+    date_hierarchy = 'pub_date'
     empty_value_display = '-пусто-'
+    actions = (export_jsonl, export_csv, regroup)
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        formfield = super().formfield_for_foreignkey(
+            db_field, request, **kwargs
+        )
+        if db_field.name == 'group':
+            # Строки list_editable копируют поле; со списком вместо
+            # запроса группы читаются один раз на страницу, а не на строку.
+            formfield.choices = list(formfield.choices)
+        return formfield
+
+    def get_search_results(self, request, queryset, search_term):
+        """Ищет по полнотекстовому индексу вместо LIKE по всем постам."""
+        if not search_term:
+            return queryset, False
+        return search.matching(queryset, search_term), False
 
 
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(LargeTableAdmin):
     list_display = (
         'pk',
         'post',
@@ -29,14 +250,21 @@ class CommentAdmin(admin.ModelAdmin):
         'text',
         'created',
     )
+    list_select_related = ('post', 'author')
+    raw_id_fields = ('post',)
+    autocomplete_fields = ('author',)
+    actions = (export_jsonl, export_csv)
 
 
-class FollowAdmin(admin.ModelAdmin):
+class FollowAdmin(LargeTableAdmin):
     list_display = (
         'pk',
         'user',
         'author',
     )
+    list_select_related = ('user', 'author')
+    autocomplete_fields = ('user', 'author')
+    actions = (export_jsonl, export_csv)
 
 
 admin.site.register(Group, GroupAdmin)
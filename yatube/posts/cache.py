@@ -0,0 +1,209 @@
+"""Версионированный кэш фрагментов лент.
+
+Ключ страницы содержит версию ленты и курсор. Сигналы на изменение
+постов поднимают версию, и старые страницы просто перестают читаться,
+поэтому время жизни записей может быть большим без риска устаревания.
+
+Кэш общий для всех процессов (см. CACHE_BACKEND в настройках), поэтому
+после смены версии страницу перерисовывает только один из них: он берёт
+блокировку через cache.add, а остальные на это время отдают прежнюю
+версию страницы или коротко ждут новую. Ответ с прежней версией
+не должен получить ETag новой: см. track_stale.
+"""
+import contextvars
+import hashlib
+import time
+from contextlib import contextmanager
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core import performance
+
+from .models import Follow, Group
+
+VERSION_KEY = 'feed:{name}:version'
+PAGE_KEY = 'feed:{name}:{version}:{cursor}'
+STALE_KEY = 'feed:{name}:stale:{cursor}'
+LOCK_KEY = 'feed:{name}:lock:{cursor}'
+COUNTER_KEY = 'feed:stats:{namespace}:{counter}'
+COUNTERS = ('hits', 'misses', 'stale')
+GROUP_KEY = 'group:{version}:{slug}'
+# Справочник групп со счётчиками и строки групп по slug.
+GROUP_DIRECTORY = 'groups'
+GROUP_ROWS = 'group_rows'
+# Как часто проверять, не дорисовал ли страницу другой процесс.
+POLL_INTERVAL = 0.05
+
+_stale = contextvars.ContextVar('feed_cache_stale', default=None)
+
+
+def _new_version():
+    # Версия из времени не повторит старую, даже если ключ был вытеснен.
+    return int(time.time() * 1000)
+
+
+def get_version(name):
+    key = VERSION_KEY.format(name=name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(name):
+    """Инвалидирует все закэшированные страницы ленты."""
+    key = VERSION_KEY.format(name=name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), None)
+
+
+def bump_versions(names):
+    """Инвалидирует много лент пачками по FEED_INVALIDATION_BATCH_SIZE.
+
+    Ленты без версии в кэше пропускаются: закэшированных страниц
+    у них быть не может.
+    """
+    names = iter(names)
+    while True:
+        batch = list(islice(names, settings.FEED_INVALIDATION_BATCH_SIZE))
+        if not batch:
+            return
+        keys = [VERSION_KEY.format(name=name) for name in batch]
+        versions = cache.get_many(keys)
+        cache.set_many(
+            {key: version + 1 for key, version in versions.items()}, None
+        )
+
+
+def follow_feed_name(user_id):
+    """Имя ленты подписок читателя; счётчики идут в пространство follow."""
+    return f'follow:{user_id}'
+
+
+def get_group(slug):
+    """Группа по slug из кэша; None, если такой группы нет.
+
+    Версия поднимается при любом изменении групп, поэтому запись
+    не переживёт смену slug или описания. Счётчики группы в кэше
+    не обновляются: их показывает справочник групп.
+    """
+    key = GROUP_KEY.format(version=get_version(GROUP_ROWS), slug=slug)
+    group = cache.get(key)
+    if group is None:
+        try:
+            group = Group.objects.get(slug=slug)
+        except Group.DoesNotExist:
+            return None
+        cache.set(key, group, settings.FEED_CACHE_TIMEOUT)
+    return group
+
+
+def bump_author_feeds(author_ids):
+    """Инвалидирует ленты подписок всех подписчиков этих авторов."""
+    followers = Follow.objects.filter(
+        author_id__in=author_ids
+    ).values_list('user_id', flat=True).distinct()
+    bump_versions(
+        follow_feed_name(user_id) for user_id in followers.iterator()
+    )
+
+
+def suggestions_feed_name(user_id):
+    """Имя блока рекомендаций читателя; счётчики идут в suggest."""
+    return f'suggest:{user_id}'
+
+
+def _namespace(name):
+    return name.split(':', 1)[0]
+
+
+def incr_counter(name, counter):
+    key = COUNTER_KEY.format(namespace=_namespace(name), counter=counter)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Первый счёт заводит ключ через add: set затёр бы счёт соседа.
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def get_stats(namespace):
+    """Возвращает счётчики попаданий и промахов кэша ленты."""
+    keys = {
+        COUNTER_KEY.format(namespace=namespace, counter=counter): counter
+        for counter in COUNTERS
+    }
+    values = cache.get_many(keys)
+    return {counter: values.get(key, 0) for key, counter in keys.items()}
+
+
+def _digest(cursor):
+    return hashlib.md5((cursor or '').encode()).hexdigest()
+
+
+def page_key(name, cursor):
+    return PAGE_KEY.format(
+        name=name, version=get_version(name), cursor=_digest(cursor)
+    )
+
+
+def _wait_for(key):
+    deadline = time.monotonic() + settings.FEED_CACHE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        content = cache.get(key)
+        if content is not None:
+            return content
+    return None
+
+
+@contextmanager
+def track_stale():
+    """Собирает имена лент, отданных внутри блока прежней версией."""
+    served = []
+    token = _stale.set(served)
+    try:
+        yield served
+    finally:
+        _stale.reset(token)
+
+
+def _served_stale(name):
+    incr_counter(name, 'stale')
+    served = _stale.get()
+    if served is not None:
+        served.append(name)
+
+
+def get_or_render(name, cursor, render):
+    """Отдаёт страницу ленты из кэша или рендерит и кладёт её туда."""
+    key = page_key(name, cursor)
+    content = cache.get(key)
+    performance.record_cache(content is not None)
+    if content is not None:
+        incr_counter(name, 'hits')
+        return content
+    incr_counter(name, 'misses')
+    digest = _digest(cursor)
+    stale_key = STALE_KEY.format(name=name, cursor=digest)
+    lock_key = LOCK_KEY.format(name=name, cursor=digest)
+    if not cache.add(lock_key, 1, settings.FEED_CACHE_LOCK_TIMEOUT):
+        # Страницу уже рисует другой процесс.
+        content = cache.get(stale_key)
+        if content is not None:
+            _served_stale(name)
+            return content
+        return _wait_for(key) or render()
+    try:
+        content = render()
+        cache.set_many(
+            {key: content, stale_key: content}, settings.FEED_CACHE_TIMEOUT
+        )
+    finally:
+        cache.delete(lock_key)
+    return content
@@ -0,0 +1,103 @@
+"""Валидаторы условных GET-запросов для лент и страницы поста.
+
+Значения дешёвые: версия ленты из кэша или одна строка из базы.
+Разметка зависит ещё и от пользователя (шапка, кнопки подписки) и от
+CSRF-cookie (токен в формах), поэтому они тоже входят в ETag.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from . import cache
+from .models import Post, UserStats
+
+
+def _etag(request, *parts):
+    parts = (
+        request.get_full_path(),
+        request.user.pk or '',
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+        *parts,
+    )
+    return hashlib.md5(
+        ':'.join(map(str, parts)).encode()
+    ).hexdigest()
+
+
+def feed_condition(etag_func):
+    """condition() для страниц с блоками feedcache.
+
+    Пока новую версию ленты рисует другой процесс, блок отдаёт прежнюю.
+    С ETag новой версии клиент закрепил бы устаревшую страницу и получал
+    бы 304 до следующей смены версии, поэтому такой ответ уходит без
+    валидатора и с no-cache.
+    """
+    def decorator(view):
+        conditional_view = condition(etag_func=etag_func)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            with cache.track_stale() as stale:
+                response = conditional_view(request, *args, **kwargs)
+            if stale:
+                del response['ETag']
+                patch_cache_control(response, no_cache=True)
+            return response
+        return wrapper
+    return decorator
+
+
+def feed_etag(request, *args, **kwargs):
+    """Ленты постов и групп меняются только вместе с версией ленты index."""
+    return _etag(request, cache.get_version('index'))
+
+
+def profile_etag(request, username):
+    try:
+        stats = UserStats.objects.values_list(
+            'posts_count', 'followers_count', 'following_count'
+        ).get(user__username=username)
+    except UserStats.DoesNotExist:
+        return None
+    parts = [cache.get_version('index'), *stats]
+    if request.user.is_authenticated:
+        # Блок рекомендаций зависит от подписок зрителя.
+        parts.append(cache.get_version(
+            cache.suggestions_feed_name(request.user.pk)
+        ))
+    return _etag(request, *parts)
+
+
+def _post_state(request, post_id):
+    # condition() спрашивает ETag и Last-Modified по отдельности,
+    # а запрос к базе нужен один.
+    if not hasattr(request, '_post_state'):
+        try:
+            request._post_state = Post.objects.annotate(
+                last_comment=Max('comments__created'),
+            ).values_list(
+                'updated_at', 'comments_count', 'last_comment',
+                'author__stats__posts_count',
+            ).get(pk=post_id)
+        except Post.DoesNotExist:
+            request._post_state = None
+    return request._post_state
+
+
+def post_etag(request, post_id):
+    state = _post_state(request, post_id)
+    if state is None:
+        return None
+    return _etag(request, *state)
+
+
+def post_last_modified(request, post_id):
+    state = _post_state(request, post_id)
+    if state is None:
+        return None
+    updated_at, _, last_comment, _ = state
+    return max(filter(None, (updated_at, last_comment)))
@@ -0,0 +1,199 @@
+"""Денормализованные счётчики постов, комментариев, подписок и групп.
+
+Счётчики меняются атомарно выражениями F() из сигналов на создание
+и удаление постов, комментариев и подписок. Если они всё же разошлись
+с данными (массовые вставки, ручные правки в базе), их чинит
+команда reconcile_counters.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models import (
+    Count, DateTimeField, F, Max, OuterRef, Subquery, Value,
+)
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Follow, Group, Post, UserStats
+
+User = get_user_model()
+
+USER_COUNTERS = ('posts_count', 'followers_count', 'following_count')
+
+
+def shift(name, delta):
+    """Выражение F(name) + delta, которое не уходит ниже нуля.
+
+    Счётчики беззнаковые, и уменьшение уже разошедшегося с данными
+    нуля иначе уронило бы удаление на CHECK-ограничении. Расхождение
+    потом чинит reconcile_counters.
+    """
+    if delta < 0:
+        return Greatest(F(name) + delta, 0)
+    return F(name) + delta
+
+
+def bump_user(user_id, **deltas):
+    """Сдвигает счётчики пользователя на заданные величины."""
+    changes = {name: shift(name, delta) for name, delta in deltas.items()}
+    if UserStats.objects.filter(user_id=user_id).update(**changes):
+        return
+    if any(delta < 0 for delta in deltas.values()):
+        # Уменьшать нечего; к тому же строка могла уйти вместе с
+        # удаляемым пользователем, и воскрешать её нельзя.
+        return
+    UserStats.objects.get_or_create(user_id=user_id)
+    UserStats.objects.filter(user_id=user_id).update(**changes)
+
+
+def bump_users(user_ids, **deltas):
+    """bump_user для многих пользователей: один UPDATE на всех сразу."""
+    user_ids = set(user_ids)
+    changes = {name: shift(name, delta) for name, delta in deltas.items()}
+    if UserStats.objects.filter(user_id__in=user_ids).update(**changes) == (
+        len(user_ids)
+    ):
+        return
+    # Редкий случай: у кого-то ещё нет строки счётчиков. Какие строки
+    # UPDATE уже сдвинул, не узнать, поэтому досоздаём недостающие
+    # сразу со значениями deltas, как если бы UPDATE прошёл и по ним.
+    if any(delta < 0 for delta in deltas.values()):
+        return
+    present = set(UserStats.objects.filter(
+        user_id__in=user_ids
+    ).values_list('user_id', flat=True))
+    for user_id in user_ids - present:
+        _, created = UserStats.objects.get_or_create(
+            user_id=user_id, defaults=deltas
+        )
+        if not created:
+            bump_user(user_id, **deltas)
+
+
+def bump_comments(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comments_count=shift('comments_count', delta)
+    )
+
+
+def add_group_post(group_id, pub_date, count=1):
+    """Учитывает count новых постов группы и сдвигает дату последнего
+    поста; pub_date — самый свежий из них."""
+    pub_date = Value(pub_date, output_field=DateTimeField())
+    Group.objects.filter(pk=group_id).update(
+        posts_count=F('posts_count') + count,
+        last_post_at=Greatest(Coalesce('last_post_at', pub_date), pub_date),
+    )
+
+
+def remove_group_post(group_id, pub_date):
+    """Убирает пост из счётчиков группы.
+
+    Дата последнего поста пересчитывается по индексу (group, -pub_date)
+    только если ушёл самый свежий пост.
+    """
+    Group.objects.filter(pk=group_id).update(
+        posts_count=shift('posts_count', -1)
+    )
+    latest = Post.objects.filter(group=OuterRef('pk')).order_by(
+        '-pub_date').values('pub_date')[:1]
+    Group.objects.filter(pk=group_id, last_post_at__lte=pub_date).update(
+        last_post_at=Subquery(latest)
+    )
+
+
+def refresh_groups(group_ids):
+    """Пересчитывает счётчики указанных групп по их постам.
+
+    Нужен после массовых update(), которые обходят сигналы. Каждый вызов
+    перечитывает все посты групп, поэтому при вставках дешевле сдвигать
+    счётчики через add_group_post.
+    """
+    posts = Post.objects.filter(group=OuterRef('pk')).order_by()
+    Group.objects.filter(pk__in=group_ids).update(
+        posts_count=Coalesce(Subquery(
+            posts.values('group').annotate(total=Count('pk'))
+            .values('total')
+        ), 0),
+        last_post_at=Subquery(
+            posts.order_by('-pub_date').values('pub_date')[:1]
+        ),
+    )
+
+
+def get_stats(user):
+    """Счётчики пользователя; для новых пользователей — нули."""
+    try:
+        return user.stats
+    except UserStats.DoesNotExist:
+        return UserStats(user=user)
+
+
+def _grouped_counts(queryset, field):
+    return dict(
+        queryset.values_list(field).annotate(total=Count('pk')).order_by()
+    )
+
+
+def reconcile_posts(batch_size=1000):
+    """Чинит число комментариев у постов, возвращает число исправленных."""
+    drifted = Post.objects.annotate(
+        real_count=Count('comments')
+    ).exclude(comments_count=F('real_count')).only('pk', 'comments_count')
+    fixed = []
+    for post in drifted.iterator():
+        post.comments_count = post.real_count
+        fixed.append(post)
+    Post.objects.bulk_update(fixed, ['comments_count'], batch_size=batch_size)
+    return len(fixed)
+
+
+def reconcile_users(batch_size=1000):
+    """Чинит счётчики пользователей, возвращает число исправленных."""
+    real = {
+        'posts_count': _grouped_counts(Post.objects, 'author_id'),
+        'followers_count': _grouped_counts(Follow.objects, 'author_id'),
+        'following_count': _grouped_counts(Follow.objects, 'user_id'),
+    }
+    UserStats.objects.bulk_create(
+        [UserStats(user_id=pk) for pk in User.objects.filter(
+            stats__isnull=True).values_list('pk', flat=True)],
+        batch_size=batch_size,
+        ignore_conflicts=True,
+    )
+    fixed = []
+    for stats in UserStats.objects.iterator():
+        changed = False
+        for name in USER_COUNTERS:
+            value = real[name].get(stats.user_id, 0)
+            if getattr(stats, name) != value:
+                setattr(stats, name, value)
+                changed = True
+        if changed:
+            fixed.append(stats)
+    UserStats.objects.bulk_update(fixed, USER_COUNTERS, batch_size=batch_size)
+    return len(fixed)
+
+
+def reconcile_groups(batch_size=1000):
+    """Чинит счётчики групп, возвращает число исправленных."""
+    real = Post.objects.filter(group__isnull=False).values(
+        'group_id').annotate(total=Count('pk'), latest=Max('pub_date'))
+    real = {row['group_id']: row for row in real.order_by()}
+    fixed = []
+    for group in Group.objects.iterator():
+        row = real.get(group.pk, {'total': 0, 'latest': None})
+        if (group.posts_count, group.last_post_at) != (
+                row['total'], row['latest']):
+            group.posts_count = row['total']
+            group.last_post_at = row['latest']
+            fixed.append(group)
+    Group.objects.bulk_update(
+        fixed, ['posts_count', 'last_post_at'], batch_size=batch_size
+    )
+    return len(fixed)
+
+
+def reconcile(batch_size=1000):
+    return {
+        'posts': reconcile_posts(batch_size),
+        'users': reconcile_users(batch_size),
+        'groups': reconcile_groups(batch_size),
+    }
@@ -0,0 +1,90 @@
+"""Подписки: одиночные и пачками, без гонок и дублей.
+
+Уникальность пары (user, author) держит ограничение unique_follow,
+поэтому вставка идёт без предварительной проверки: повторная подписка
+(двойной клик, два запроса сразу) упирается в ограничение и считается
+уже выполненной.
+"""
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+
+from . import cache, counters, suggestions, timeline
+from .models import Follow
+
+User = get_user_model()
+
+
+def follow(user, author):
+    """Подписывает user на author; True, если подписка новая."""
+    if user.pk == author.pk:
+        return False
+    try:
+        with transaction.atomic(), suggestions.refreshed_by_caller():
+            Follow.objects.create(user=user, author=author)
+    except IntegrityError:
+        return False
+    suggestions.refresh_on_commit(user.pk)
+    return True
+
+
+def unfollow(user, author):
+    """Отписывает user от author; True, если подписка была."""
+    with suggestions.refreshed_by_caller():
+        deleted, _ = Follow.objects.filter(
+            user=user, author=author
+        ).delete()
+    if deleted:
+        suggestions.refresh_on_commit(user.pk)
+    return bool(deleted)
+
+
+def resolve(usernames):
+    """Переводит имена пользователей в id одним запросом."""
+    return dict(
+        User.objects.filter(username__in=set(usernames))
+        .values_list('username', 'pk')
+    )
+
+
+def follow_many(user_id, author_ids):
+    """Подписывает читателя на многих авторов, возвращает число новых.
+
+    Вставка идёт одним bulk_create с ON CONFLICT DO NOTHING, а новыми
+    считаются пары, которых не было до вставки и которые есть после неё
+    в той же транзакции. bulk_create обходит сигналы, поэтому счётчики,
+    лента и кэш обновляются здесь же.
+    """
+    author_ids = set(author_ids) - {user_id}
+    pairs = Follow.objects.filter(user_id=user_id, author_id__in=author_ids)
+    with transaction.atomic():
+        before = set(pairs.values_list('author_id', flat=True))
+        Follow.objects.bulk_create(
+            [Follow(user_id=user_id, author_id=pk)
+             for pk in author_ids - before],
+            ignore_conflicts=True,
+        )
+        new = set(pairs.values_list('author_id', flat=True)) - before
+        if not new:
+            return 0
+        counters.bump_user(user_id, following_count=len(new))
+        counters.bump_users(new, followers_count=1)
+        if timeline.is_materialized(user_id):
+            timeline.backfill(user_id, new)
+    cache.bump_version(cache.follow_feed_name(user_id))
+    suggestions.refresh_on_commit(user_id)
+    return len(new)
+
+
+def unfollow_many(user_id, author_ids):
+    """Отписывает читателя от многих авторов, возвращает число удалённых.
+
+    Удаление идёт через ORM, сигналы сами чинят счётчики и ленту;
+    рекомендации пересчитываются один раз на всю пачку.
+    """
+    with suggestions.refreshed_by_caller():
+        deleted, _ = Follow.objects.filter(
+            user_id=user_id, author_id__in=set(author_ids)
+        ).delete()
+    if deleted:
+        suggestions.refresh_on_commit(user_id)
+    return deleted
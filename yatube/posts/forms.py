@@ -1,7 +1,7 @@
 from django.contrib.auth.forms import UserCreationForm
 from django import forms
 
-from .models import Post, Comment
+from .models import Group, Post, Comment
 
 
 class PostForm(forms.ModelForm):
@@ -14,3 +14,13 @@ class CommentForm(forms.ModelForm):
     class Meta(UserCreationForm.Meta):
         model = Comment
         fields = ('text',)
+
+
+class RegroupForm(forms.Form):
+    """Целевая группа для массового переноса постов в админке."""
+    group = forms.ModelChoiceField(
+        Group.objects.order_by('title'),
+        required=False,
+        empty_label='Без группы',
+        label='Группа',
+    )
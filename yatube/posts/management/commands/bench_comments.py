@@ -0,0 +1,82 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.test import Client
+from django.urls import reverse
+
+from core.bench import format_summary, rolled_back, summarize, timer
+from posts.models import Comment, Post
+from posts.paginator import NEXT, encode_cursor
+
+User = get_user_model()
+
+BENCH_USERNAME = 'bench-commenter'
+BATCH_SIZE = 5000
+# Адрес вне INTERNAL_IPS, чтобы панель отладки не попадала в замер.
+REMOTE_ADDR = '10.0.0.1'
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает выдачу всех комментариев поста разом с постраничной '
+        'подгрузкой. Данные создаются в транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--comments', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def fill(self, post, author, total):
+        for offset in range(0, total, BATCH_SIZE):
+            Comment.objects.bulk_create(
+                Comment(post=post, author=author, text=f'Комментарий {number}')
+                for number in range(offset, min(offset + BATCH_SIZE, total))
+            )
+
+    def measure(self, name, request, repeat):
+        latencies = []
+        for _ in range(repeat):
+            with timer(latencies):
+                size = len(request())
+        self.stdout.write(format_summary(name, summarize(latencies)))
+        self.stdout.write(f'{"":<40} {size / 1024:.1f} КиБ')
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        with rolled_back():
+            author, _ = User.objects.get_or_create(username=BENCH_USERNAME)
+            post = Post.objects.create(author=author, text='Обсуждение')
+            self.fill(post, author, options['comments'])
+            client = Client(REMOTE_ADDR=REMOTE_ADDR)
+            detail = reverse('posts:post_detail', kwargs={'post_id': post.pk})
+            fragment = reverse('posts:comments', kwargs={'post_id': post.pk})
+            # Курсор страницы из середины обсуждения.
+            middle = Comment.objects.filter(post=post).order_by(
+                'created', 'pk')[options['comments'] // 2]
+            cursor = encode_cursor(NEXT, 2, [middle.created, middle.pk])
+
+            def everything():
+                comments = Comment.objects.filter(
+                    post=post).select_related('author').order_by(
+                    'created', 'pk')
+                return render_to_string(
+                    'posts/includes/comment_list.html',
+                    {'post_id': post.pk, 'comments': list(comments)},
+                )
+
+            self.measure('все комментарии разом', everything, repeat)
+            self.measure(
+                'страница поста', lambda: client.get(detail).content, repeat
+            )
+            self.measure(
+                'фрагмент из середины',
+                lambda: client.get(fragment, {'cursor': cursor}).content,
+                repeat,
+            )
+            self.measure(
+                'JSON из середины',
+                lambda: client.get(
+                    fragment, {'cursor': cursor, 'format': 'json'}
+                ).content,
+                repeat,
+            )
@@ -0,0 +1,97 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.bench import format_summary, rolled_back, summarize, timer
+from posts import counters
+from posts.models import Group, Post
+from posts.paginator import NEXT, encode_cursor
+
+User = get_user_model()
+
+BENCH_USERNAME = 'bench-group-writer'
+BATCH_SIZE = 10000
+# Адрес вне INTERNAL_IPS, чтобы панель отладки не попадала в замер.
+REMOTE_ADDR = '10.0.0.1'
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет ленту группы с большим числом постов и справочник групп: '
+        'время и число запросов. Данные создаются в транзакции '
+        'и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument('--groups', type=int, default=50)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def fill(self, author, groups, total):
+        # bulk_create обходит сигналы, счётчики групп чинятся после.
+        for offset in range(0, total, BATCH_SIZE):
+            Post.objects.bulk_create(
+                Post(author=author, group=groups[0], text=f'Пост {number}')
+                for number in range(offset, min(offset + BATCH_SIZE, total))
+            )
+        counters.reconcile_groups()
+
+    def measure(self, name, request, repeat, warm=False):
+        latencies = []
+        for _ in range(repeat):
+            if not warm:
+                cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                with timer(latencies):
+                    request()
+        self.stdout.write(format_summary(name, summarize(latencies)))
+        self.stdout.write(f'{"":<40} запросов: {len(queries)}')
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        with rolled_back():
+            author, _ = User.objects.get_or_create(username=BENCH_USERNAME)
+            groups = Group.objects.bulk_create(
+                Group(title=f'Группа {number}', slug=f'bench-{number}',
+                      description='Описание')
+                for number in range(options['groups'])
+            )
+            self.stdout.write(
+                f'Заполняем группу {options["posts"]} постами...'
+            )
+            self.fill(author, groups, options['posts'])
+            self.report(groups[0], options['posts'], repeat)
+
+    def report(self, group, total, repeat):
+        client = Client(REMOTE_ADDR=REMOTE_ADDR)
+        url = reverse('posts:group_list', kwargs={'slug': group.slug})
+        posts = Post.objects.filter(group=group).order_by('-pub_date', '-pk')
+        middle = posts[total // 2]
+        cursor = encode_cursor(NEXT, 2, [middle.pub_date, middle.pk])
+        per_page = settings.NUMBER_OF_POST_PER_PAGE
+        offset_page = Paginator(posts, per_page).get_page(
+            total // 2 // per_page
+        )
+
+        self.measure('группа: первая страница, холодно',
+                     lambda: client.get(url), repeat)
+        self.measure('группа: первая страница, тепло',
+                     lambda: client.get(url), repeat, warm=True)
+        self.measure('группа: середина по курсору',
+                     lambda: client.get(url, {'cursor': cursor}),
+                     repeat, warm=True)
+        self.measure('группа: середина по OFFSET',
+                     lambda: list(offset_page.paginator.page(
+                         offset_page.number).object_list),
+                     repeat)
+        directory = reverse('posts:groups')
+        self.measure('справочник групп, холодно',
+                     lambda: client.get(directory), repeat)
+        self.measure('справочник групп, тепло',
+                     lambda: client.get(directory), repeat, warm=True)
@@ -0,0 +1,99 @@
+import os
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image
+from sorl.thumbnail import default
+from sorl.thumbnail.parsers import parse_geometry
+
+from posts import thumbnails
+from posts.models import Post
+
+# Прежний единственный вариант: кроп 960x339 в JPEG.
+LEGACY = ('960x339', thumbnails.options('JPEG'))
+
+
+def _collect(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                for name in sorted(names):
+                    yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def _open(path):
+    with open(path, 'rb') as source:
+        image = Image.open(source)
+        image.load()
+    return image
+
+
+def _size(image, geometry_string, options):
+    """Размер в байтах миниатюры, какой её записал бы sorl."""
+    options = dict(default.backend.default_options, **options)
+    ratio = default.engine.get_image_ratio(image, options)
+    geometry = parse_geometry(geometry_string, ratio)
+    thumbnail = default.engine.create(image.copy(), geometry, options)
+    raw = default.engine._get_raw_data(
+        thumbnail, options['format'], options['quality'], image_info={},
+    )
+    return len(raw or b'')
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает объём прежней миниатюры 960x339 и новых вариантов '
+        'по ширинам и форматам на наборе картинок.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*',
+            help='Файлы или каталоги с картинками; по умолчанию — '
+                 'картинки постов из хранилища.',
+        )
+
+    def handle(self, *args, **options):
+        paths = list(_collect(options['paths'])) or [
+            default_storage.path(name)
+            for name in Post.objects.exclude(image='')
+            .values_list('image', flat=True).distinct()
+        ]
+        variants = [LEGACY] + list(thumbnails.GEOMETRIES)
+        totals = [0] * len(variants)
+        images = 0
+        for path in paths:
+            try:
+                image = _open(path)
+            except (OSError, ValueError) as error:
+                self.stderr.write(f'{path}: {error}')
+                continue
+            images += 1
+            for index, (geometry_string, variant_options) in enumerate(
+                variants
+            ):
+                totals[index] += _size(image, geometry_string, variant_options)
+        if not images:
+            raise CommandError('Нет картинок для замера.')
+
+        legacy = totals[0]
+        self.stdout.write(f'Картинок: {images}')
+        for (geometry_string, variant_options), total in zip(
+            variants, totals
+        ):
+            share = total / legacy if legacy else 0
+            self.stdout.write(
+                f'{geometry_string:>8} {variant_options["format"]:<5} '
+                f'{total / images / 1024:9.1f} КиБ на картинку  '
+                f'{share:6.0%} от прежнего'
+            )
+        mobile = min(
+            total for (geometry_string, _), total in zip(variants, totals)
+            if geometry_string == thumbnails.geometry(thumbnails.WIDTHS[0])
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Мобильный клиент получает {mobile / legacy:.0%} байт '
+            f'прежней миниатюры'
+        ))
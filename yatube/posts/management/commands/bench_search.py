@@ -0,0 +1,88 @@
+import random
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from core.bench import format_summary, rolled_back, summarize, timer
+from posts import search
+from posts.models import Post
+
+User = get_user_model()
+
+BENCH_USERNAME = 'bench-writer'
+BATCH_SIZE = 10000
+FILLER = [f'слово{number}' for number in range(5000)]
+# Частое слово есть примерно в каждом третьем посте, редкое — в одном
+# из десяти тысяч, третьего нет совсем.
+QUERIES = {
+    'частое': ('погода', 3),
+    'редкое': ('гиппопотам', 10000),
+    'нет в базе': ('абракадабра', None),
+}
+
+
+def _text(rng, number):
+    words = rng.choices(FILLER, k=30)
+    for word, every in QUERIES.values():
+        if every and number % every == 0:
+            words.insert(rng.randrange(len(words)), word)
+    return ' '.join(words)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает LIKE и FTS5 на первой странице выдачи при разном '
+        'числе постов. Данные создаются в транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[100000, 1000000],
+            help='Размеры базы постов для замеров.',
+        )
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def fill(self, author, rng, start, stop):
+        for offset in range(start, stop, BATCH_SIZE):
+            Post.objects.bulk_create(
+                Post(author=author, text=_text(rng, number))
+                for number in range(offset, min(offset + BATCH_SIZE, stop))
+            )
+
+    def measure(self, query, repeat):
+        latencies = []
+        for _ in range(repeat):
+            with timer(latencies):
+                list(query()[:settings.NUMBER_OF_POST_PER_PAGE + 1])
+        return summarize(latencies)
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        with rolled_back():
+            author, _ = User.objects.get_or_create(username=BENCH_USERNAME)
+            total = 0
+            for size in sorted(options['sizes']):
+                self.stdout.write(f'Заполняем базу до {size} постов...')
+                self.fill(author, rng, total, size)
+                total = size
+                self.report(size, options['repeat'])
+
+    def report(self, size, repeat):
+        for kind, (word, _) in QUERIES.items():
+            like = self.measure(
+                lambda: Post.objects.filter(text__icontains=word)
+                .order_by('-pub_date', '-pk'),
+                repeat,
+            )
+            fts = self.measure(
+                lambda: search.ranked(Post.objects.all(), word)
+                .order_by('rank', 'pk'),
+                repeat,
+            )
+            self.stdout.write(format_summary(f'{size} LIKE {kind}', like))
+            self.stdout.write(format_summary(f'{size} FTS5 {kind}', fts))
+            speedup = like['p50'] / fts['p50'] if fts['p50'] else 0
+            self.stdout.write(self.style.SUCCESS(
+                f'{size} {kind}: LIKE/FTS5 по p50 = {speedup:.1f}'
+            ))
@@ -0,0 +1,102 @@
+import random
+import time
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.bench import format_summary, rolled_back, summarize, timer
+from posts import suggestions
+from posts.models import Follow
+
+User = get_user_model()
+
+BATCH_SIZE = 10000
+SEED = 25
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет рекомендации «Кого почитать» на синтетическом графе '
+        'подписок: загрузку графа, пакетный пересчёт и refresh одного '
+        'читателя. Данные создаются в транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50000)
+        parser.add_argument('--edges', type=int, default=1000000)
+        parser.add_argument(
+            '--sample', type=int, default=2000,
+            help='Сколько читателей пересчитать в пакетном замере.',
+        )
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def fill(self, total_users, total_edges):
+        """Граф с популярными авторами: вес автора ~ 1 / ранг (Ципф)."""
+        random.seed(SEED)
+        first = (User.objects.order_by('-pk').values_list(
+            'pk', flat=True).first() or 0) + 1
+        for offset in range(0, total_users, BATCH_SIZE):
+            User.objects.bulk_create(
+                User(username=f'bench-reader-{number}', password='!')
+                for number in range(
+                    offset, min(offset + BATCH_SIZE, total_users))
+            )
+        user_ids = list(User.objects.filter(
+            pk__gte=first).values_list('pk', flat=True))
+        weights = list(accumulate(
+            1 / rank for rank in range(1, len(user_ids) + 1)
+        ))
+        per_user = max(total_edges // len(user_ids), 1)
+        edges = []
+        for user_id in user_ids:
+            authors = set(random.choices(
+                user_ids, cum_weights=weights, k=per_user))
+            authors.discard(user_id)
+            edges.extend(Follow(user_id=user_id, author_id=author_id)
+                         for author_id in authors)
+            if len(edges) >= BATCH_SIZE:
+                Follow.objects.bulk_create(edges)
+                edges = []
+        Follow.objects.bulk_create(edges)
+        return user_ids
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            self.stdout.write(
+                f'Строим граф: {options["users"]} читателей, '
+                f'~{options["edges"]} подписок...'
+            )
+            user_ids = self.fill(options['users'], options['edges'])
+            self.report(user_ids, options)
+
+    def report(self, user_ids, options):
+        started = time.perf_counter()
+        graph = suggestions.Graph.load()
+        loaded = time.perf_counter() - started
+        edges = sum(map(len, graph.following.values()))
+        self.stdout.write(
+            f'{"загрузка графа":<40} {loaded:.2f} с, рёбер: {edges}'
+        )
+
+        sample = random.sample(user_ids, min(options['sample'], len(user_ids)))
+        started = time.perf_counter()
+        total = suggestions.rebuild(sample)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{"пакетный пересчёт":<40} {total / elapsed:.0f} читателей/с '
+            '(с загрузкой графа)'
+        )
+
+        latencies = []
+        readers = random.sample(user_ids, min(options['repeat'],
+                                              len(user_ids)))
+        for user_id in readers:
+            with CaptureQueriesContext(connection) as queries:
+                with timer(latencies):
+                    suggestions.refresh(user_id)
+        self.stdout.write(format_summary('refresh читателя',
+                                         summarize(latencies)))
+        self.stdout.write(f'{"":<40} запросов: {len(queries)}')
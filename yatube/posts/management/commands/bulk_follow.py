@@ -0,0 +1,55 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import follows
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Подписывает читателей на авторов (или отписывает с --unfollow) '
+        'пачкой, например на рекомендуемых авторов при онбординге.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('authors', nargs='+', help='Имена авторов.')
+        readers = parser.add_mutually_exclusive_group(required=True)
+        readers.add_argument(
+            '--user', action='append', dest='users', default=[],
+            help='Имя читателя; можно указать несколько раз.',
+        )
+        readers.add_argument(
+            '--without-follows', action='store_true',
+            help='Все пользователи, у которых ещё нет подписок.',
+        )
+        parser.add_argument('--unfollow', action='store_true')
+
+    def readers(self, options):
+        if options['without_follows']:
+            return User.objects.filter(follower__isnull=True).values_list(
+                'pk', flat=True)
+        ids = follows.resolve(options['users'])
+        unknown = set(options['users']) - ids.keys()
+        if unknown:
+            raise CommandError(f'Нет пользователей: {", ".join(unknown)}')
+        return ids.values()
+
+    def handle(self, *args, **options):
+        authors = follows.resolve(options['authors'])
+        unknown = set(options['authors']) - authors.keys()
+        if unknown:
+            raise CommandError(f'Нет авторов: {", ".join(unknown)}')
+        change = (
+            follows.unfollow_many if options['unfollow']
+            else follows.follow_many
+        )
+        # Список читателей читается заранее: подписки меняют выборку.
+        readers = list(self.readers(options))
+        changed = sum(
+            change(user_id, authors.values()) for user_id in readers
+        )
+        action = 'Удалено' if options['unfollow'] else 'Создано'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} подписок: {changed} у {len(readers)} читателей'
+        ))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from posts import cache
+
+
+class Command(BaseCommand):
+    help = 'Показывает попадания и промахи кэша лент.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'feeds', nargs='*', default=['index', 'follow', 'groups'],
+            help='Имена лент (по умолчанию index, follow и groups).',
+        )
+
+    def handle(self, *args, **options):
+        for name in options['feeds']:
+            stats = cache.get_stats(name)
+            total = stats['hits'] + stats['misses']
+            ratio = stats['hits'] / total if total else 0
+            self.stdout.write(
+                f'{name}: попаданий {stats["hits"]}, '
+                f'промахов {stats["misses"]}, доля попаданий {ratio:.1%}, '
+                f'отдано устаревших при перерисовке {stats["stale"]}'
+            )
@@ -0,0 +1,387 @@
+import csv
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from PIL import Image
+
+from posts import cache, counters, thumbnails, timeline
+from posts.models import Comment, Follow, Group, ImportCheckpoint, Post
+
+User = get_user_model()
+
+FORMATS = ('jsonl', 'csv')
+
+
+def _bulk_insert(model, objects):
+    """bulk_create, после которого у объектов есть первичные ключи.
+
+    PostgreSQL возвращает ключи сам. SQLite их не отдаёт, но держит
+    блокировку записи до конца транзакции пачки, и чужие вставки ждут.
+    Поэтому ключи пачки — последние len(objects) ключей таблицы.
+    """
+    model.objects.bulk_create(objects)
+    if not objects or objects[0].pk is not None:
+        return
+    pks = model.objects.order_by('-pk').values_list('pk', flat=True)
+    for obj, pk in zip(objects, sorted(pks[:len(objects)])):
+        obj.pk = pk
+
+
+def _read_jsonl(file):
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def _read_csv(file):
+    for row in csv.DictReader(file):
+        # Комментарии в CSV лежат JSON-списком в одной колонке.
+        row['comments'] = json.loads(row.get('comments') or '[]')
+        yield row
+
+
+def _parse_date(value, default):
+    if not value:
+        return default
+    date = parse_datetime(value)
+    if date is None:
+        raise ValueError(f'неверная дата {value!r}')
+    if timezone.is_naive(date):
+        date = timezone.make_aware(date)
+    return date
+
+
+def _ingest_image(path, make_thumbnails):
+    """Проверяет картинку, кладёт её в хранилище и готовит миниатюры."""
+    try:
+        with Image.open(path) as image:
+            image.verify()
+        with open(path, 'rb') as file:
+            name = default_storage.save(
+                f'posts/{os.path.basename(path)}', File(file)
+            )
+        if make_thumbnails:
+            thumbnails.generate(name)
+    except (OSError, SyntaxError) as error:
+        return None, error
+    finally:
+        connections.close_all()
+    return name, None
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует посты с комментариями из JSON Lines или CSV пачками '
+        'через bulk_create. Каждая пачка — отдельная транзакция, и в ней '
+        'же обновляется контрольная точка в базе, поэтому прерванный '
+        'импорт продолжается с места остановки без повторов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='Файл со строками: author, text, pub_date, group, '
+                 'group_title, image, comments [{author, text, created}].',
+        )
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument(
+            '--images-dir', default='',
+            help='Каталог, относительно которого заданы картинки.',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument(
+            '--checkpoint',
+            help='Имя контрольной точки (по умолчанию полный путь файла).',
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Начать заново, не глядя на контрольную точку.',
+        )
+        parser.add_argument(
+            '--create-users', action='store_true',
+            help='Создавать неизвестных авторов без пароля; иначе '
+                 'их строки пропускаются.',
+        )
+        parser.add_argument(
+            '--no-thumbnails', action='store_true',
+            help='Не создавать миниатюры при импорте.',
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.checkpoint = (
+            options['checkpoint'] or os.path.abspath(options['path'])
+        )
+        if options['restart']:
+            ImportCheckpoint.objects.filter(source=self.checkpoint).delete()
+        state = ImportCheckpoint.objects.filter(
+            source=self.checkpoint
+        ).first() or ImportCheckpoint(source=self.checkpoint)
+        done = state.rows
+        if done:
+            self.stdout.write(f'Продолжаем с {done + 1}-й строки')
+        # Авторы прошлых запусков: их ленты ещё не пересобраны.
+        self.authors = set(json.loads(state.authors))
+        self.users = dict(User.objects.values_list('username', 'pk'))
+        self.groups = dict(Group.objects.values_list('slug', 'pk'))
+        self.stats = dict.fromkeys(
+            ('rows', 'posts', 'comments', 'images', 'skipped'), 0
+        )
+        self.started = time.perf_counter()
+        with open(options['path'], encoding='utf-8', newline='') as file:
+            rows = islice(self.read(file), done, None)
+            with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+                while True:
+                    batch = list(islice(rows, options['batch_size']))
+                    if not batch:
+                        break
+                    done += len(batch)
+                    self.import_batch(batch, pool, done)
+                    self.report()
+        self.maintain()
+        self.authors.clear()
+        self.save_checkpoint(done)
+        self.report(final=True)
+
+    def read(self, file):
+        format_ = self.options['format'] or (
+            'csv' if self.options['path'].endswith('.csv') else 'jsonl'
+        )
+        reader = _read_csv if format_ == 'csv' else _read_jsonl
+        for number, row in enumerate(reader(file), start=1):
+            row['line'] = number
+            yield row
+
+    def save_checkpoint(self, rows):
+        ImportCheckpoint.objects.update_or_create(
+            source=self.checkpoint,
+            defaults={
+                'rows': rows, 'authors': json.dumps(sorted(self.authors)),
+            },
+        )
+
+    def skip(self, row, reason):
+        self.stats['skipped'] += 1
+        self.stderr.write(f'Строка {row["line"]}: {reason}')
+
+    def import_batch(self, batch, pool, done):
+        # Строки проверяются до картинок: у пропущенных не остаётся файлов.
+        rows = self.validate(batch)
+        # Картинки обрабатываются до транзакции: потокам пула не нужно
+        # ждать блокировку записи, которую держит вставка пачки.
+        images = self.ingest_images(rows, pool)
+        with transaction.atomic():
+            self.resolve_users(rows)
+            self.resolve_groups(rows)
+            posts, post_comments = self.build(rows, images)
+            pub_dates = [post.pub_date for post in posts]
+            _bulk_insert(Post, posts)
+            comments = []
+            for post, items in zip(posts, post_comments):
+                for comment in items:
+                    comment.post_id = post.pk
+                comments.extend(items)
+            created = [comment.created for comment in comments]
+            _bulk_insert(Comment, comments)
+            # auto_now_add перетирает даты при вставке, поэтому отдельно.
+            for post, pub_date in zip(posts, pub_dates):
+                post.pub_date = post.updated_at = pub_date
+            for comment, date in zip(comments, created):
+                comment.created = date
+            Post.objects.bulk_update(posts, ['pub_date', 'updated_at'])
+            Comment.objects.bulk_update(comments, ['created'])
+            self.maintain_batch(posts)
+            self.save_checkpoint(done)
+        self.stats['rows'] += len(batch)
+        self.stats['posts'] += len(posts)
+        self.stats['comments'] += len(comments)
+
+    def validate(self, batch):
+        valid = []
+        for row in batch:
+            try:
+                self.check_row(row)
+            except (KeyError, ValueError) as error:
+                self.skip(row, error)
+            else:
+                valid.append(row)
+        return valid
+
+    def check_row(self, row):
+        """Проверки build_post, которым не нужны записи в базе."""
+        if not row.get('text'):
+            raise ValueError('пустой текст')
+        self.check_author(row.get('author'), 'автор')
+        _parse_date(row.get('pub_date'), None)
+        for comment in row.get('comments') or ():
+            if 'text' not in comment:
+                raise KeyError('text')
+            self.check_author(comment.get('author'), 'автор комментария')
+            _parse_date(comment.get('created'), None)
+
+    def check_author(self, name, role):
+        if name in self.users or (name and self.options['create_users']):
+            return
+        raise ValueError(f'неизвестный {role} {name!r}')
+
+    def ingest_images(self, batch, pool):
+        root = self.options['images_dir']
+        paths = {
+            row['line']: os.path.join(root, row['image'])
+            for row in batch if row.get('image')
+        }
+        make_thumbnails = not self.options['no_thumbnails']
+        results = pool.map(
+            _ingest_image, paths.values(), [make_thumbnails] * len(paths)
+        )
+        images = {}
+        for line, (name, error) in zip(paths, results):
+            if error is not None:
+                self.stderr.write(f'Строка {line}: картинка пропущена: '
+                                  f'{error}')
+                continue
+            images[line] = name
+            self.stats['images'] += 1
+        return images
+
+    def resolve_users(self, batch):
+        names = {row['author'] for row in batch if row.get('author')}
+        for row in batch:
+            names.update(
+                comment['author'] for comment in row.get('comments') or ()
+            )
+        missing = names - self.users.keys()
+        if not missing or not self.options['create_users']:
+            return
+        User.objects.bulk_create(
+            [User(username=name, password='!') for name in missing],
+            ignore_conflicts=True,
+        )
+        self.users.update(
+            User.objects.filter(username__in=missing)
+            .values_list('username', 'pk')
+        )
+
+    def resolve_groups(self, batch):
+        titles = {}
+        for row in batch:
+            slug = row.get('group')
+            if slug and slug not in self.groups and not titles.get(slug):
+                titles[slug] = row.get('group_title')
+        if not titles:
+            return
+        Group.objects.bulk_create(
+            [Group(slug=slug, title=(title or slug)[:200], description='')
+             for slug, title in titles.items()],
+            ignore_conflicts=True,
+        )
+        self.groups.update(
+            Group.objects.filter(slug__in=titles).values_list('slug', 'pk')
+        )
+        cache.bump_version(cache.GROUP_ROWS)
+
+    def build(self, batch, images):
+        """Собирает посты пачки и списки комментариев к каждому."""
+        now = timezone.now()
+        posts, comments = [], []
+        for row in batch:
+            try:
+                post, post_comments = self.build_post(row, images, now)
+            except (KeyError, ValueError) as error:
+                self.skip(row, error)
+                if row['line'] in images:
+                    default_storage.delete(images[row['line']])
+                continue
+            posts.append(post)
+            comments.append(post_comments)
+        return posts, comments
+
+    def build_post(self, row, images, now):
+        if not row.get('text'):
+            raise ValueError('пустой текст')
+        author_id = self.users.get(row.get('author'))
+        if author_id is None:
+            raise ValueError(f'неизвестный автор {row.get("author")!r}')
+        pub_date = _parse_date(row.get('pub_date'), now)
+        comments = [
+            self.build_comment(comment, pub_date)
+            for comment in row.get('comments') or ()
+        ]
+        post = Post(
+            author_id=author_id,
+            group_id=self.groups.get(row.get('group')),
+            text=row['text'],
+            image=images.get(row['line'], ''),
+            pub_date=pub_date,
+            updated_at=pub_date,
+            comments_count=len(comments),
+        )
+        return post, comments
+
+    def build_comment(self, comment, pub_date):
+        author_id = self.users.get(comment.get('author'))
+        if author_id is None:
+            raise ValueError(
+                f'неизвестный автор комментария {comment.get("author")!r}'
+            )
+        return Comment(
+            author_id=author_id,
+            text=comment['text'],
+            created=_parse_date(comment.get('created'), pub_date),
+        )
+
+    def maintain_batch(self, posts):
+        """Счётчики, которые bulk_create не обновил через сигналы.
+
+        Выполняется в транзакции пачки, поэтому счётчики фиксируются
+        вместе с постами и не разъезжаются при обрыве импорта.
+        """
+        per_author, per_group = {}, {}
+        for post in posts:
+            per_author[post.author_id] = per_author.get(post.author_id, 0) + 1
+            if post.group_id is not None:
+                count, latest = per_group.get(
+                    post.group_id, (0, post.pub_date)
+                )
+                per_group[post.group_id] = (
+                    count + 1, max(latest, post.pub_date)
+                )
+        for author_id, count in per_author.items():
+            counters.bump_user(author_id, posts_count=count)
+        for group_id, (count, latest) in per_group.items():
+            counters.add_group_post(group_id, latest, count)
+        self.authors.update(per_author)
+
+    def maintain(self):
+        """Пересобирает ленты подписчиков и сбрасывает кэши лент."""
+        self.stdout.write('Обновляем ленты и кэши...')
+        followers = list(Follow.objects.filter(
+            author_id__in=self.authors
+        ).values_list('user_id', flat=True).distinct())
+        timeline.rebuild_many(followers)
+        cache.bump_version('index')
+        cache.bump_version(cache.GROUP_DIRECTORY)
+        cache.bump_author_feeds(self.authors)
+
+    def report(self, final=False):
+        elapsed = time.perf_counter() - self.started
+        speed = self.stats['rows'] / elapsed if elapsed else 0
+        message = (
+            f'Строк: {self.stats["rows"]}, постов: {self.stats["posts"]}, '
+            f'комментариев: {self.stats["comments"]}, '
+            f'картинок: {self.stats["images"]}, '
+            f'пропущено: {self.stats["skipped"]}; '
+            f'{speed:.0f} строк/с за {elapsed:.1f} с'
+        )
+        self.stdout.write(self.style.SUCCESS(message) if final else message)
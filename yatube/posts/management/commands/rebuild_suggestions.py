@@ -0,0 +1,40 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from posts import suggestions
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает рекомендации «Кого почитать» по всему графу '
+        'подписок. Запускается по расписанию: подписка пересчитывает '
+        'рекомендации только своего читателя.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'usernames', nargs='*',
+            help='Читатели, чьи рекомендации пересчитать (по умолчанию все).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=suggestions.BATCH_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options['usernames']:
+            user_ids = User.objects.filter(
+                username__in=options['usernames']
+            ).values_list('pk', flat=True).iterator()
+        started = time.perf_counter()
+        total = suggestions.rebuild(user_ids, options['batch_size'])
+        elapsed = time.perf_counter() - started
+        speed = total / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано читателей: {total} за {elapsed:.1f} с '
+            f'({speed:.0f} читателей/с)'
+        ))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from posts import counters
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает денормализованные счётчики и чинит расхождения.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Размер пачки при массовом обновлении.',
+        )
+
+    def handle(self, *args, **options):
+        fixed = counters.reconcile(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено постов: {fixed["posts"]}, '
+            f'пользователей: {fixed["users"]}, групп: {fixed["groups"]}'
+        ))
@@ -0,0 +1,191 @@
+import datetime
+import io
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from faker import Faker
+from PIL import Image
+
+from posts import cache, counters, timeline
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+SEED_PASSWORD = 'seed-password'
+# Картинок немного, посты ссылаются на них по кругу.
+MAX_IMAGE_FILES = 20
+
+
+def _next_pk(model):
+    return (model.objects.aggregate(top=Max('pk'))['top'] or 0) + 1
+
+
+def _batches(objects, size):
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Наполняет базу правдоподобными пользователями, группами, постами, '
+        'комментариями, подписками и картинками через bulk_create.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument('--follows', type=int, default=10000)
+        parser.add_argument(
+            '--images', type=int, default=100,
+            help='Сколько постов получат картинку.',
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='На сколько дней назад раскидать даты постов.',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.fake = Faker('ru_RU')
+        self.fake.seed_instance(options['seed'])
+        self.batch_size = options['batch_size']
+        started = time.perf_counter()
+        with transaction.atomic():
+            user_ids = self.create_users(options['users'])
+            group_ids = self.create_groups(options['groups'])
+            post_ids = self.create_posts(
+                options['posts'], user_ids, group_ids,
+                options['images'], options['days'],
+            )
+            self.create_comments(options['comments'], user_ids, post_ids)
+            self.create_follows(options['follows'], user_ids)
+        self.stdout.write('Пересчитываем счётчики и ленты...')
+        counters.reconcile(self.batch_size)
+        timeline.rebuild_many()
+        cache.bump_version('index')
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {time.perf_counter() - started:.1f} с. '
+            f'Пароль созданных пользователей: {SEED_PASSWORD}'
+        ))
+
+    def bulk_create(self, model, objects):
+        for batch in _batches(objects, self.batch_size):
+            model.objects.bulk_create(batch, ignore_conflicts=True)
+
+    def create_users(self, count):
+        start = _next_pk(User)
+        password = make_password(SEED_PASSWORD)
+        self.bulk_create(User, (
+            User(
+                pk=pk,
+                username=f'seed{pk}',
+                first_name=self.fake.first_name(),
+                last_name=self.fake.last_name(),
+                password=password,
+            )
+            for pk in range(start, start + count)
+        ))
+        self.stdout.write(f'Пользователей: {count}')
+        return list(range(start, start + count))
+
+    def create_groups(self, count):
+        start = _next_pk(Group)
+        self.bulk_create(Group, (
+            Group(
+                pk=pk,
+                title=self.fake.catch_phrase()[:200],
+                slug=f'seed-{pk}',
+                description=self.fake.paragraph(),
+            )
+            for pk in range(start, start + count)
+        ))
+        self.stdout.write(f'Групп: {count}')
+        return list(range(start, start + count))
+
+    def create_images(self, count):
+        names = []
+        for number in range(min(count, MAX_IMAGE_FILES)):
+            color = tuple(self.rng.randrange(256) for _ in range(3))
+            buffer = io.BytesIO()
+            Image.new('RGB', (1280, 720), color).save(buffer, 'JPEG')
+            names.append(default_storage.save(
+                f'posts/seed_{number}.jpg', ContentFile(buffer.getvalue())
+            ))
+        return names
+
+    def create_posts(self, count, user_ids, group_ids, images, days):
+        if not user_ids:
+            return []
+        start = _next_pk(Post)
+        image_names = self.create_images(images)
+        now = timezone.now()
+        span = datetime.timedelta(days=days).total_seconds()
+        for batch in _batches(range(start, start + count), self.batch_size):
+            posts = [
+                Post(
+                    pk=pk,
+                    author_id=self.rng.choice(user_ids),
+                    group_id=(
+                        self.rng.choice(group_ids)
+                        if group_ids and self.rng.random() < 0.7 else None
+                    ),
+                    text=self.fake.text(self.rng.randint(50, 800)),
+                    image=(
+                        image_names[(pk - start) % len(image_names)]
+                        if pk - start < images and image_names else ''
+                    ),
+                )
+                for pk in batch
+            ]
+            Post.objects.bulk_create(posts)
+            # auto_now_add перетирает дату при вставке, поэтому отдельно.
+            for post in posts:
+                post.pub_date = post.updated_at = now - datetime.timedelta(
+                    seconds=self.rng.uniform(0, span)
+                )
+            Post.objects.bulk_update(posts, ['pub_date', 'updated_at'])
+        self.stdout.write(f'Постов: {count}')
+        return list(range(start, start + count))
+
+    def create_comments(self, count, user_ids, post_ids):
+        if not user_ids or not post_ids:
+            return
+        self.bulk_create(Comment, (
+            Comment(
+                post_id=self.rng.choice(post_ids),
+                author_id=self.rng.choice(user_ids),
+                text=self.fake.sentence(),
+            )
+            for _ in range(count)
+        ))
+        self.stdout.write(f'Комментариев: {count}')
+
+    def create_follows(self, count, user_ids):
+        count = min(count, len(user_ids) * (len(user_ids) - 1))
+        pairs = set()
+        while len(pairs) < count:
+            user_id, author_id = self.rng.sample(user_ids, 2)
+            pairs.add((user_id, author_id))
+        self.bulk_create(Follow, (
+            Follow(user_id=user_id, author_id=author_id)
+            for user_id, author_id in pairs
+        ))
+        self.stdout.write(f'Подписок: {count}')
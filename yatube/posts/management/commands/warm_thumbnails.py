@@ -0,0 +1,51 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from posts import thumbnails
+from posts.models import Post
+
+
+def _warm(image_name):
+    try:
+        thumbnails.generate(image_name)
+    except Exception as error:
+        return image_name, error
+    finally:
+        connections.close_all()
+    return image_name, None
+
+
+class Command(BaseCommand):
+    help = 'Заранее создаёт миниатюры для всех картинок постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=settings.THUMBNAIL_WORKERS or 1,
+            help='Число потоков генерации.',
+        )
+
+    def handle(self, *args, **options):
+        names = (
+            Post.objects.exclude(image='')
+            .values_list('image', flat=True)
+            .distinct()
+            .iterator()
+        )
+        started = time.perf_counter()
+        done = failed = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            for name, error in pool.map(_warm, names):
+                if error is None:
+                    done += 1
+                    continue
+                failed += 1
+                self.stderr.write(f'{name}: {error}')
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово картинок: {done}, с ошибками: {failed}, '
+            f'за {elapsed:.1f} с'
+        ))
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2026-10-17 08:40
+
+from django.db import migrations, models
+
+
+def remove_self_follows(apps, schema_editor):
+    Follow = apps.get_model('posts', 'Follow')
+    Follow.objects.filter(user=models.F('author')).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_group_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_self_follows, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='follow',
+            constraint=models.CheckConstraint(check=models.Q(_negated=True, user=models.F('author')), name='follow_not_self'),
+        ),
+    ]
@@ -12,6 +12,18 @@ class Group(models.Model):
     )
     slug = models.SlugField(unique=True)
     description = models.TextField()
+    # Обновляются сигналами на посты, см. posts.counters.
+    posts_count = models.PositiveIntegerField(
+        'Число постов',
+        default=0,
+        editable=False
+    )
+    last_post_at = models.DateTimeField(
+        'Дата последнего поста',
+        blank=True,
+        null=True,
+        editable=False
+    )
 
     def __str__(self):
         return self.title
@@ -26,6 +38,10 @@ class Post(models.Model):
         'Дата публикации',
         auto_now_add=True
     )
+    updated_at = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -45,10 +61,42 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    comments_count = models.PositiveIntegerField(
+        'Число комментариев',
+        default=0,
+        editable=False
+    )
+
+    class Meta:
+        # Ленты сортируются по (pub_date, id), см. posts.paginator.
+        indexes = [
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_pub_date_idx',
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_pub_date_idx',
+            ),
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='post_pub_date_id_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.text[:15]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        post = super().from_db(db, field_names, values)
+        # Группа на момент загрузки: по ней сигналы замечают перенос
+        # поста в другую группу без повторного запроса.
+        post._loaded_group_id = post.__dict__.get(
+            'group_id', models.DEFERRED
+        )
+        return post
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
@@ -72,6 +120,14 @@ class Comment(models.Model):
         auto_now_add=True
     )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['post', 'created'],
+                name='comment_post_created_idx',
+            ),
+        ]
+
     def __str__(self):
         return self.text[:15]
 
@@ -89,3 +145,119 @@ class Follow(models.Model):
         related_name='following',
         verbose_name='Автор',
     )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'],
+                name='unique_follow',
+            ),
+            models.CheckConstraint(
+                check=~models.Q(user=models.F('author')),
+                name='follow_not_self',
+            ),
+        ]
+
+
+class TimelineEntry(models.Model):
+    """Материализованная лента подписок: пост в ленте читателя.
+
+    pub_date копируется из поста, чтобы страница ленты читалась одним
+    проходом по индексу (user, -pub_date, -id) без соединения с Follow.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Читатель',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Пост',
+    )
+    pub_date = models.DateTimeField('Дата публикации')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'],
+                name='unique_timeline_entry',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-id'],
+                name='timeline_user_pub_date_idx',
+            ),
+        ]
+
+
+class UserStats(models.Model):
+    """Денормализованные счётчики пользователя, см. posts.counters."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Пользователь',
+    )
+    posts_count = models.PositiveIntegerField('Число постов', default=0)
+    followers_count = models.PositiveIntegerField(
+        'Число подписчиков', default=0
+    )
+    following_count = models.PositiveIntegerField(
+        'Число подписок', default=0
+    )
+
+    def __str__(self):
+        return f'Счётчики {self.user_id}'
+
+
+class FollowSuggestion(models.Model):
+    """Предрассчитанная рекомендация «на кого подписаться», см.
+    posts.suggestions."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follow_suggestions',
+        verbose_name='Читатель',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='suggested_to',
+        verbose_name='Автор',
+    )
+    score = models.FloatField('Оценка')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'],
+                name='unique_follow_suggestion',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-score'],
+                name='suggestion_user_score_idx',
+            ),
+        ]
+
+
+class ImportCheckpoint(models.Model):
+    """Прогресс import_posts по одному файлу.
+
+    Обновляется в транзакции пачки, поэтому пачка и отметка о ней
+    фиксируются или откатываются вместе.
+    """
+    source = models.CharField('Источник', max_length=500, unique=True)
+    rows = models.PositiveIntegerField('Импортировано строк', default=0)
+    # id авторов в JSON: их подписчикам ещё не пересобраны ленты.
+    authors = models.TextField('Авторы без пересборки лент', default='[]')
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
+
+    def __str__(self):
+        return f'{self.source}: {self.rows}'
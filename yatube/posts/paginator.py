@@ -0,0 +1,158 @@
+import base64
+import binascii
+import datetime
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import SimpleLazyObject, cached_property
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+def _to_json(value):
+    # DjangoJSONEncoder обрезает микросекунды, а ключу нужна полная точность.
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    raise TypeError(f'Значение {value!r} нельзя положить в курсор')
+
+
+def encode_cursor(direction, number, values):
+    """Упаковывает направление, номер страницы и ключ в непрозрачный токен."""
+    payload = json.dumps([direction, number, *values], default=_to_json)
+    token = base64.urlsafe_b64encode(payload.encode())
+    return token.decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Распаковывает токен; для испорченного курсора возвращает None."""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        direction, number, *values = json.loads(payload)
+    except (TypeError, ValueError, binascii.Error):
+        return None
+    if (direction not in (NEXT, PREVIOUS) or len(values) != 2
+            or not isinstance(number, int) or number < 2):
+        return None
+    return direction, number, values
+
+
+class CursorPaginator(Paginator):
+    """Пагинатор по ключу (поле сортировки, pk) без COUNT и OFFSET.
+
+    Оба поля ordering должны сортироваться в одну сторону, чтобы выборка
+    страницы была одним проходом по составному индексу. Один экземпляр
+    обслуживает одну страницу: get_page() запоминает курсор, а запрос
+    к базе выполняется лениво, при первом обращении к записям страницы.
+    Номер страницы едет внутри курсора и нужен только для навигации.
+    """
+
+    def __init__(self, object_list, per_page, ordering=('-pub_date', '-pk')):
+        self.ordering = ordering
+        self.fields = [name.lstrip('-') for name in ordering]
+        self.descending = ordering[0].startswith('-')
+        self.direction = self.values = None
+        self.number = 1
+        super().__init__(object_list.order_by(*ordering), per_page)
+
+    def key(self, row):
+        return [getattr(row, name) for name in self.fields]
+
+    def transform(self, rows):
+        """Хук для подклассов: превращает строки выборки в объекты ленты."""
+        return rows
+
+    def clean_values(self, values):
+        """Приводит значения из курсора к типам полей ключа."""
+        opts = self.object_list.model._meta
+        cleaned = []
+        for name, value in zip(self.fields, values):
+            if not isinstance(value, (str, int, float)):
+                raise ValidationError('Неверное значение курсора')
+            try:
+                field = opts.pk if name == 'pk' else opts.get_field(name)
+            except FieldDoesNotExist:
+                # Аннотации (например, ранг поиска) сравниваются как числа.
+                cleaned.append(float(value))
+                continue
+            cleaned.append(field.to_python(value))
+        return cleaned
+
+    def get_rows(self):
+        queryset = self.object_list
+        if self.direction is not None:
+            forward = self.direction == NEXT
+            lookup = 'lt' if forward == self.descending else 'gt'
+            first, second = self.fields
+            queryset = queryset.filter(
+                Q(**{f'{first}__{lookup}': self.values[0]})
+                | Q(**{first: self.values[0],
+                       f'{second}__{lookup}': self.values[1]})
+            )
+            if not forward:
+                queryset = queryset.reverse()
+        return list(queryset[:self.per_page + 1])
+
+    @cached_property
+    def rows(self):
+        rows = self.get_rows()
+        self.has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if self.direction == PREVIOUS:
+            rows.reverse()
+        return rows
+
+    @cached_property
+    def num_pages(self):
+        """Номер последней известной страницы: текущая или следующая."""
+        if not self.rows:
+            return self.number
+        if self.direction == PREVIOUS or self.has_more:
+            return self.number + 1
+        return self.number
+
+    @property
+    def cursor(self):
+        """Нормализованный курсор текущей страницы (пустой для первой)."""
+        if self.direction is None:
+            return ''
+        return encode_cursor(self.direction, self.number, self.values)
+
+    @property
+    def next_cursor(self):
+        if self.number >= self.num_pages:
+            return None
+        return encode_cursor(NEXT, self.number + 1, self.key(self.rows[-1]))
+
+    @property
+    def previous_cursor(self):
+        """Курсор предыдущей страницы; для второй — пустая строка."""
+        if self.number <= 1 or not self.rows:
+            return None
+        if self.number == 2:
+            return ''
+        return encode_cursor(
+            PREVIOUS, self.number - 1, self.key(self.rows[0])
+        )
+
+    def get_page(self, cursor):
+        """Возвращает страницу по токену; битый токен даёт первую страницу."""
+        decoded = decode_cursor(cursor) if cursor else None
+        if decoded is not None:
+            direction, number, values = decoded
+            try:
+                self.values = self.clean_values(values)
+            except (ValidationError, ValueError):
+                pass
+            else:
+                self.direction, self.number = direction, number
+        return self._get_page(
+            SimpleLazyObject(lambda: self.transform(self.rows)),
+            self.number,
+            self,
+        )
+
+    def page(self, cursor):
+        return self.get_page(cursor)
@@ -0,0 +1,132 @@
+"""Полнотекстовый поиск по постам на SQLite FTS5.
+
+Индекс — внешняя таблица posts_post_fts над posts_post: текст хранится
+только в постах, а индекс обновляют триггеры. Триггеры создаются
+миграцией и пересоздаются после каждого migrate, потому что SQLite
+теряет их, когда миграция перестраивает таблицу постов.
+На других СУБД поиск откатывается к LIKE.
+"""
+import re
+
+from django.db import connection, connections
+from django.db.models import F, FloatField, Value
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .paginator import CursorPaginator
+
+TABLE = 'posts_post_fts'
+# Маркеры подсветки: управляющие символы не встречаются в тексте постов.
+START, END = '\x02', '\x03'
+
+CREATE_TABLE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+    "text, content='posts_post', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')"
+)
+CREATE_TRIGGERS = (
+    f"CREATE TRIGGER IF NOT EXISTS {TABLE}_ai AFTER INSERT ON posts_post "
+    f"BEGIN INSERT INTO {TABLE}(rowid, text) VALUES (new.id, new.text); END",
+    f"CREATE TRIGGER IF NOT EXISTS {TABLE}_ad AFTER DELETE ON posts_post "
+    f"BEGIN INSERT INTO {TABLE}({TABLE}, rowid, text) "
+    "VALUES ('delete', old.id, old.text); END",
+    f"CREATE TRIGGER IF NOT EXISTS {TABLE}_au "
+    "AFTER UPDATE OF text ON posts_post "
+    f"BEGIN INSERT INTO {TABLE}({TABLE}, rowid, text) "
+    "VALUES ('delete', old.id, old.text); "
+    f"INSERT INTO {TABLE}(rowid, text) VALUES (new.id, new.text); END",
+)
+REBUILD = f"INSERT INTO {TABLE}({TABLE}) VALUES ('rebuild')"
+
+
+class _Rowids(RawSQL):
+    """Подзапрос для pk__in без собственных скобок.
+
+    Lookup __in в Django 2.2 сам берёт правую часть в скобки, и обычный
+    RawSQL давал IN ((SELECT ...)): скалярный подзапрос, одну строку.
+    """
+
+    def as_sql(self, compiler, connection):
+        return self.sql, self.params
+
+
+def is_available(using=connection):
+    return using.vendor == 'sqlite'
+
+
+def install(cursor, rebuild=False):
+    """Создаёт индекс и триггеры, если их ещё нет."""
+    cursor.execute(CREATE_TABLE)
+    for statement in CREATE_TRIGGERS:
+        cursor.execute(statement)
+    if rebuild:
+        cursor.execute(REBUILD)
+
+
+def ensure_installed(using='default', **kwargs):
+    """Обработчик post_migrate: возвращает триггеры после перестроек."""
+    if is_available(connections[using]):
+        with connections[using].cursor() as cursor:
+            install(cursor)
+
+
+def to_match(query):
+    """Превращает ввод пользователя в безопасный запрос FTS5.
+
+    Каждое слово ищется по префиксу, слова объединяются через AND.
+    """
+    words = re.findall(r'\w+', query)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def matching(queryset, query):
+    """Отбирает посты по запросу без ранжирования (для админки)."""
+    match = to_match(query)
+    if not match:
+        return queryset.none()
+    if not is_available():
+        return queryset.filter(text__icontains=query)
+    return queryset.filter(pk__in=_Rowids(
+        f'SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s', (match,)
+    ))
+
+
+def ranked(queryset, query):
+    """Посты по запросу с рангом bm25 и размеченным текстом."""
+    match = to_match(query)
+    if not match or not is_available():
+        queryset = queryset.filter(text__icontains=query).annotate(
+            rank=Value(0.0, FloatField()), highlighted=F('text'),
+        )
+        return queryset if match else queryset.none()
+    # Ранг и подсветку считают коррелированные подзапросы к индексу:
+    # FTS5 находит строку по rowid внутри того же MATCH без перебора.
+    row = f'FROM {TABLE} WHERE {TABLE} MATCH %s AND rowid = posts_post.id'
+    return matching(queryset, query).annotate(
+        # bm25 отрицателен: чем меньше, тем релевантнее.
+        rank=RawSQL(f'SELECT bm25({TABLE}) {row}', (match,)),
+        highlighted=RawSQL(
+            f'SELECT highlight({TABLE}, 0, %s, %s) {row}',
+            (START, END, match),
+        ),
+    )
+
+
+def highlight(text):
+    """Экранирует текст и заменяет маркеры совпадений на <mark>."""
+    return mark_safe(
+        escape(text).replace(START, '<mark>').replace(END, '</mark>')
+    )
+
+
+class SearchPaginator(CursorPaginator):
+    """Выдача поиска: по рангу, затем по pk, с подсветкой совпадений."""
+
+    def __init__(self, object_list, per_page, ordering=('rank', 'pk')):
+        super().__init__(object_list, per_page, ordering)
+
+    def transform(self, rows):
+        for post in rows:
+            post.highlighted = highlight(post.highlighted)
+        return rows
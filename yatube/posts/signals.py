@@ -0,0 +1,138 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import DEFERRED
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import cache, counters, suggestions, timeline
+from .models import Comment, Follow, Group, Post
+
+
+def _after_commit(func, *args):
+    # Версии кэша поднимаются после фиксации: иначе параллельный читатель
+    # успел бы закэшировать под новой версией ещё старые данные.
+    transaction.on_commit(lambda: func(*args))
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post(sender, instance, created, **kwargs):
+    if created and settings.TIMELINE_ENABLED:
+        timeline.fan_out(instance)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_index_feed(sender, **kwargs):
+    _after_commit(cache.bump_versions, ['index', cache.GROUP_DIRECTORY])
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_groups(sender, **kwargs):
+    _after_commit(cache.bump_version, cache.GROUP_ROWS)
+
+
+@receiver(post_save, sender=Follow)
+def count_new_follow(sender, instance, created, **kwargs):
+    # Подключены раньше ленты: timeline.is_materialized читает уже
+    # сдвинутый счётчик подписок.
+    if created:
+        counters.bump_user(instance.user_id, following_count=1)
+        counters.bump_user(instance.author_id, followers_count=1)
+
+
+@receiver(post_delete, sender=Follow)
+def count_deleted_follow(sender, instance, **kwargs):
+    counters.bump_user(instance.user_id, following_count=-1)
+    counters.bump_user(instance.author_id, followers_count=-1)
+
+
+@receiver(post_save, sender=Follow)
+def backfill_timeline(sender, instance, created, **kwargs):
+    if created and timeline.is_materialized(instance.user_id):
+        timeline.backfill(instance.user_id, [instance.author_id])
+
+
+@receiver(post_delete, sender=Follow)
+def prune_timeline(sender, instance, **kwargs):
+    if not settings.TIMELINE_ENABLED:
+        return
+    timeline.prune(instance.user_id, instance.author_id)
+    if timeline.following_count(instance.user_id) == (
+        settings.TIMELINE_MAX_FOLLOWING
+    ):
+        # Читатель вернулся под порог: его лента могла не вестись.
+        timeline.rebuild(instance.user_id)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_follower_feeds(sender, instance, **kwargs):
+    # Подключён после fan_out_post: новая версия ленты уже видит пост.
+    _after_commit(cache.bump_author_feeds, [instance.author_id])
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_follow_feed(sender, instance, **kwargs):
+    _after_commit(
+        cache.bump_version, cache.follow_feed_name(instance.user_id)
+    )
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def refresh_suggestions(sender, instance, **kwargs):
+    # После фиксации: при каскадном удалении пользователя его подписки
+    # уходят раньше него, и свежие рекомендации сослались бы на него.
+    if not suggestions.is_refreshed_by_caller():
+        suggestions.refresh_on_commit(instance.user_id)
+
+
+@receiver(pre_save, sender=Post)
+def remember_group(sender, instance, **kwargs):
+    # Редактирование может перенести пост в другую группу. Обычно прежняя
+    # группа известна с загрузки (Post.from_db), а запрос нужен только
+    # посту, собранному с готовым pk или без поля group.
+    if instance._state.adding:
+        return
+    if getattr(instance, '_loaded_group_id', DEFERRED) is DEFERRED:
+        instance._loaded_group_id = Post.objects.filter(
+            pk=instance.pk
+        ).values_list('group_id', flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+def count_new_post(sender, instance, created, **kwargs):
+    if created:
+        saved_group_id = None
+        counters.bump_user(instance.author_id, posts_count=1)
+    else:
+        saved_group_id = instance._loaded_group_id
+    instance._loaded_group_id = instance.group_id
+    if saved_group_id == instance.group_id:
+        return
+    if saved_group_id:
+        counters.remove_group_post(saved_group_id, instance.pub_date)
+    if instance.group_id:
+        counters.add_group_post(instance.group_id, instance.pub_date)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    counters.bump_user(instance.author_id, posts_count=-1)
+    if instance.group_id:
+        counters.remove_group_post(instance.group_id, instance.pub_date)
+
+
+@receiver(post_save, sender=Comment)
+def count_new_comment(sender, instance, created, **kwargs):
+    if created:
+        counters.bump_comments(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    counters.bump_comments(instance.post_id, -1)
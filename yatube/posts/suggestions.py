@@ -0,0 +1,204 @@
+"""Рекомендации «на кого подписаться» по графу подписок.
+
+Граф хранится построчно, как разреженная матрица смежности: для каждого
+читателя — отсортированный кортеж авторов (строка матрицы A), для
+каждого автора — кортеж подписчиков (строка Aᵀ). Оценка кандидата
+складывается из двух произведений строк:
+
+* друзья друзей — строка A·A: на кого подписаны те, на кого подписан
+  читатель;
+* соподписчики — строка (A·Aᵀ)·A: читатели с похожими подписками,
+  взвешенные числом общих авторов, и их подписки.
+
+Суммы строк считает Counter.update, который обходит кортежи на C.
+Чтобы популярные авторы не раздували работу, от каждого автора берутся
+не больше MAX_CO_FOLLOWERS подписчиков, а в расчёт идут не больше
+MAX_SIMILAR_USERS самых похожих читателей.
+
+Пакетный пересчёт (rebuild) загружает весь граф один раз. Подписка
+или отписка пересчитывает рекомендации только её читателя (refresh)
+по подграфу из нескольких запросов вокруг него; подписки соседей в нём
+ограничены в среднем MAX_NEIGHBOUR_FOLLOWING на соседа.
+"""
+import contextvars
+import heapq
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+
+from . import cache
+from .models import Follow, FollowSuggestion
+
+FOF_WEIGHT = 1.0
+CO_FOLLOW_WEIGHT = 2.0
+MAX_CO_FOLLOWERS = 50
+MAX_SIMILAR_USERS = 100
+MAX_NEIGHBOUR_FOLLOWING = 200
+BATCH_SIZE = 1000
+
+_refreshed_by_caller = contextvars.ContextVar(
+    'suggestions_refreshed_by_caller', default=False
+)
+
+
+class Graph:
+    """Граф подписок в виде двух построчных разреженных матриц."""
+
+    def __init__(self, edges):
+        following, followers = defaultdict(list), defaultdict(list)
+        for user_id, author_id in edges:
+            following[user_id].append(author_id)
+            followers[author_id].append(user_id)
+        self.following = {
+            user_id: tuple(sorted(ids)) for user_id, ids in following.items()
+        }
+        self.followers = {
+            author_id: tuple(sorted(ids))
+            for author_id, ids in followers.items()
+        }
+
+    @classmethod
+    def load(cls):
+        """Весь граф из базы одним проходом."""
+        return cls(Follow.objects.values_list(
+            'user_id', 'author_id').iterator())
+
+    @classmethod
+    def around(cls, user_id):
+        """Подграф, которого хватает для рекомендаций одного читателя."""
+        own = list(Follow.objects.filter(user_id=user_id).values_list(
+            'user_id', 'author_id'))
+        authors = [author_id for _, author_id in own]
+        if not authors:
+            return cls(own)
+        # Свежие подписчики авторов читателя, в среднем по
+        # MAX_CO_FOLLOWERS на автора.
+        co_followers = list(Follow.objects.filter(
+            author_id__in=authors
+        ).exclude(user_id=user_id).order_by('-pk').values_list(
+            'user_id', 'author_id'
+        )[:MAX_CO_FOLLOWERS * len(authors)])
+        similar = similar_users(cls(own + co_followers), user_id)
+        readers = set(authors) | {similar_id for similar_id, _ in similar}
+        # Так же и свежие подписки соседей: читатель, подписанный на
+        # тех, кто сам читает тысячи авторов, не тянет их все.
+        further = Follow.objects.filter(user_id__in=readers).order_by(
+            '-pk').values_list('user_id', 'author_id')[
+            :MAX_NEIGHBOUR_FOLLOWING * len(readers)]
+        return cls(set(own) | set(co_followers) | set(further))
+
+
+def similar_users(graph, user_id):
+    """Читатели с общими авторами и число этих авторов (строка A·Aᵀ)."""
+    shared = Counter()
+    for author_id in graph.following.get(user_id, ()):
+        shared.update(graph.followers.get(author_id, ())[-MAX_CO_FOLLOWERS:])
+    shared.pop(user_id, None)
+    return shared.most_common(MAX_SIMILAR_USERS)
+
+
+def score(graph, user_id, limit):
+    """Лучшие limit кандидатов читателя: [(author_id, оценка), ...]."""
+    following = graph.following.get(user_id, ())
+    if not following:
+        return []
+    friends_of_friends = Counter()
+    for author_id in following:
+        friends_of_friends.update(graph.following.get(author_id, ()))
+    co_followed = Counter()
+    for similar_id, shared in similar_users(graph, user_id):
+        theirs = graph.following.get(similar_id)
+        if not theirs:
+            continue
+        weight = shared / len(theirs)
+        co_followed.update(dict.fromkeys(theirs, weight))
+    excluded = set(following) | {user_id}
+    scores = {
+        author_id: (
+            FOF_WEIGHT * friends_of_friends[author_id]
+            + CO_FOLLOW_WEIGHT * co_followed[author_id]
+        )
+        for author_id in friends_of_friends.keys() | co_followed.keys()
+        if author_id not in excluded
+    }
+    # При равной оценке выше тот, кто зарегистрировался раньше.
+    return heapq.nlargest(
+        limit, scores.items(), key=lambda item: (item[1], -item[0])
+    )
+
+
+def store(results):
+    """Заменяет рекомендации читателей: {user_id: [(author_id, оценка)]}."""
+    with transaction.atomic():
+        FollowSuggestion.objects.filter(user_id__in=results).delete()
+        FollowSuggestion.objects.bulk_create(
+            FollowSuggestion(user_id=user_id, author_id=author_id, score=value)
+            for user_id, ranked in results.items()
+            for author_id, value in ranked
+        )
+    cache.bump_versions(
+        cache.suggestions_feed_name(user_id) for user_id in results
+    )
+
+
+def rebuild(user_ids=None, batch_size=BATCH_SIZE):
+    """Пересчитывает рекомендации пачками, возвращает число читателей."""
+    graph = Graph.load()
+    limit = settings.FOLLOW_SUGGESTIONS_LIMIT
+    if user_ids is None:
+        # У читателей без подписок рекомендаций быть не может.
+        FollowSuggestion.objects.filter(user__follower__isnull=True).delete()
+        user_ids = graph.following.keys()
+    user_ids = iter(user_ids)
+    total = 0
+    while True:
+        batch = list(islice(user_ids, batch_size))
+        if not batch:
+            return total
+        store({user_id: score(graph, user_id, limit) for user_id in batch})
+        total += len(batch)
+
+
+def refresh(user_id):
+    """Пересчитывает рекомендации одного читателя после смены подписок.
+
+    Соседям читателя рекомендации не пересчитываются: их догоняет
+    периодический rebuild_suggestions.
+    """
+    graph = Graph.around(user_id)
+    store({user_id: score(
+        graph, user_id, settings.FOLLOW_SUGGESTIONS_LIMIT
+    )})
+
+
+def refresh_on_commit(user_id):
+    """Откладывает refresh до фиксации текущей транзакции."""
+    transaction.on_commit(lambda: refresh(user_id))
+
+
+@contextmanager
+def refreshed_by_caller():
+    """Внутри блока сигналы Follow не пересчитывают рекомендации.
+
+    Так сервис подписок, меняющий пачку рёбер одного читателя, сам
+    вызывает refresh один раз вместо пересчёта на каждую строку.
+    """
+    token = _refreshed_by_caller.set(True)
+    try:
+        yield
+    finally:
+        _refreshed_by_caller.reset(token)
+
+
+def is_refreshed_by_caller():
+    return _refreshed_by_caller.get()
+
+
+def for_user(user):
+    """Рекомендации для блока на странице; запрос выполняется лениво."""
+    return FollowSuggestion.objects.filter(user=user).select_related(
+        'author').order_by('-score', 'author_id')[
+        :settings.FOLLOW_SUGGESTIONS_LIMIT]
@@ -0,0 +1,39 @@
+from django import template
+
+from posts import cache
+
+register = template.Library()
+
+
+class FeedCacheNode(template.Node):
+    def __init__(self, nodelist, name, cursor):
+        self.nodelist = nodelist
+        self.name = name
+        self.cursor = cursor
+
+    def render(self, context):
+        return cache.get_or_render(
+            self.name.resolve(context),
+            self.cursor.resolve(context),
+            lambda: self.nodelist.render(context),
+        )
+
+
+@register.tag
+def feedcache(parser, token):
+    """Кэширует фрагмент ленты по версии ленты и курсору страницы.
+
+    {% feedcache "index" page_obj.paginator.cursor %} ... {% endfeedcache %}
+    """
+    bits = token.split_contents()
+    if len(bits) != 3:
+        raise template.TemplateSyntaxError(
+            f'{bits[0]} принимает имя ленты и курсор'
+        )
+    nodelist = parser.parse(('endfeedcache',))
+    parser.delete_first_token()
+    return FeedCacheNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        parser.compile_filter(bits[2]),
+    )
@@ -0,0 +1,16 @@
+from django import template
+
+from posts import thumbnails
+
+register = template.Library()
+
+
+@register.inclusion_tag('posts/includes/post_image.html')
+def post_image(image):
+    """Выводит картинку поста через <picture> с вариантами по ширине.
+
+    {% post_image post.image %}
+    """
+    if not image:
+        return {}
+    return thumbnails.picture(image)
@@ -0,0 +1,154 @@
+from unittest import mock
+
+from django.contrib.admin import helpers
+from django.contrib.admin.models import DELETION, LogEntry
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.paginator import EstimatedCountPaginator
+from posts.admin import PostAdmin
+from posts.models import Comment, Group, Post, UserStats
+
+User = get_user_model()
+
+
+class PostAdminTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Первая', slug='first', description='описание'
+        )
+        cls.other = Group.objects.create(
+            title='Вторая', slug='second', description='описание'
+        )
+        cls.url = reverse('admin:posts_post_changelist')
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def create_posts(self, count):
+        return [
+            Post.objects.create(
+                author=self.author, group=self.group, text=f'пост {number}'
+            )
+            for number in range(count)
+        ]
+
+    def changelist_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+        return len(queries)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        self.create_posts(3)
+        few = self.changelist_queries()
+        self.create_posts(12)
+        self.assertEqual(self.changelist_queries(), few)
+
+    @override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=1)
+    def test_paginator_estimates_unfiltered_count(self):
+        posts = self.create_posts(3)
+        posts[0].delete()
+        estimated = EstimatedCountPaginator(Post.objects.order_by('pk'), 10)
+        self.assertEqual(estimated.count, posts[-1].pk)
+        exact = EstimatedCountPaginator(
+            Post.objects.filter(group=self.group).order_by('pk'), 10
+        )
+        self.assertEqual(exact.count, 2)
+
+    @override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=1)
+    def test_page_past_real_rows_falls_back_to_exact_count(self):
+        posts = self.create_posts(5)
+        Post.objects.filter(pk__in=[post.pk for post in posts[:4]]).delete()
+        paginator = EstimatedCountPaginator(Post.objects.order_by('pk'), 2)
+        self.assertEqual(paginator.num_pages, 3)
+        page = paginator.page(3)
+        self.assertEqual(list(page.object_list), posts[4:])
+        self.assertEqual((page.number, paginator.count), (1, 1))
+        with mock.patch.object(PostAdmin, 'list_per_page', 2):
+            response = self.client.get(self.url, {'p': 2})
+        self.assertContains(response, 'пост 4')
+
+    def run_action(self, action, posts, **data):
+        return self.client.post(self.url, {
+            'action': action,
+            helpers.ACTION_CHECKBOX_NAME: [post.pk for post in posts],
+            **data,
+        })
+
+    @override_settings(ADMIN_ACTION_CHUNK_SIZE=2)
+    def test_delete_in_chunks_asks_then_deletes(self):
+        posts = self.create_posts(5)
+        response = self.run_action('delete_in_chunks', posts[:4], index=0)
+        self.assertContains(response, 'Будет удалено записей: 4')
+        self.assertEqual(Post.objects.count(), 5)
+        self.run_action('delete_in_chunks', posts[:4], post='yes')
+        self.assertEqual(list(Post.objects.all()), posts[4:])
+        stats = UserStats.objects.get(user=self.author)
+        self.assertEqual(stats.posts_count, 1)
+
+    def test_one_regroup_action_for_any_number_of_groups(self):
+        response = self.client.get(self.url)
+        actions = dict(response.context['action_form'].fields[
+            'action'].choices)
+        self.assertIn('regroup', actions)
+        self.assertFalse(any(
+            name.startswith('regroup_') for name in actions
+        ))
+
+    def test_regroup_to_no_group(self):
+        posts = self.create_posts(2)
+        self.run_action('regroup', posts[:1], apply='yes', group='')
+        self.assertEqual(Post.objects.filter(group=None).count(), 1)
+
+    def test_delete_in_chunks_writes_admin_log(self):
+        posts = self.create_posts(3)
+        self.run_action('delete_in_chunks', posts[:2], post='yes')
+        logged = LogEntry.objects.filter(action_flag=DELETION)
+        self.assertEqual(
+            sorted(logged.values_list('object_id', flat=True)),
+            sorted(str(post.pk) for post in posts[:2]),
+        )
+        self.assertEqual(logged.first().user, self.admin)
+
+    def test_delete_in_chunks_respects_cascade_permissions(self):
+        """Без права удалять комментарии нельзя удалить пост с ними."""
+        staff = User.objects.create_user(username='staff', is_staff=True)
+        staff.user_permissions.set(Permission.objects.filter(
+            codename__in=('view_post', 'change_post', 'delete_post')
+        ))
+        self.client.force_login(staff)
+        commented, plain = self.create_posts(2)
+        Comment.objects.create(post=commented, author=self.author, text='к')
+        response = self.run_action(
+            'delete_in_chunks', [commented], post='yes'
+        )
+        self.assertContains(response, 'нет прав')
+        self.assertTrue(Post.objects.filter(pk=commented.pk).exists())
+        self.run_action('delete_in_chunks', [plain], post='yes')
+        self.assertFalse(Post.objects.filter(pk=plain.pk).exists())
+
+    @override_settings(ADMIN_ACTION_CHUNK_SIZE=2)
+    def test_regroup_moves_posts_and_refreshes_counters(self):
+        posts = self.create_posts(5)
+        response = self.run_action('regroup', posts[:3], index=0)
+        self.assertContains(response, 'Будет перенесено постов: 3')
+        self.assertEqual(Post.objects.filter(group=self.other).count(), 0)
+        self.run_action(
+            'regroup', posts[:3], apply='yes', group=self.other.pk
+        )
+        self.assertEqual(Post.objects.filter(group=self.other).count(), 3)
+        self.group.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 2)
+        self.assertEqual(self.other.posts_count, 3)
+        self.assertEqual(self.other.last_post_at, posts[2].pub_date)
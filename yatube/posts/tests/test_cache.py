@@ -0,0 +1,183 @@
+import multiprocessing
+import shutil
+import tempfile
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache as django_cache
+from django.db import transaction
+from django.test import (
+    Client, SimpleTestCase, TestCase, TransactionTestCase, override_settings,
+)
+from django.urls import reverse
+
+from posts import cache
+from posts.models import Follow, Post
+
+User = get_user_model()
+
+WORKERS = 4
+
+
+def worker(barrier, rounds, results, renders):
+    """Процесс-воркер: на каждом раунде читает страницу ленты index."""
+    def render():
+        time.sleep(0.3)
+        renders.put(1)
+        return f'rendered-{round_number}'
+
+    for round_number in range(rounds):
+        barrier.wait()
+        results.put((round_number, cache.get_or_render('index', '', render)))
+        barrier.wait()
+
+
+def count_hits(barrier, times):
+    barrier.wait()
+    for _ in range(times):
+        cache.incr_counter('index', 'hits')
+
+
+@override_settings(FEED_CACHE_LOCK_WAIT=2)
+class SharedFeedCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        settings = override_settings(CACHES={'default': {
+            'BACKEND': 'core.cache.FileBasedCache',
+            'LOCATION': self.location,
+        }})
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.addCleanup(shutil.rmtree, self.location, ignore_errors=True)
+
+    def test_invalidation_reaches_every_process(self):
+        """Смена версии видна всем процессам, а рендерит один."""
+        context = multiprocessing.get_context('fork')
+        barrier = context.Barrier(WORKERS + 1)
+        results, renders = context.Queue(), context.Queue()
+        processes = [
+            context.Process(
+                target=worker, args=(barrier, 3, results, renders)
+            )
+            for _ in range(WORKERS)
+        ]
+        for process in processes:
+            process.start()
+
+        def play_round():
+            barrier.wait()
+            barrier.wait()
+            return [results.get(timeout=5)[1] for _ in range(WORKERS)]
+
+        first = play_round()
+        self.assertEqual(len(set(first)), 1)
+        cache.bump_version('index')
+        second = play_round()
+        third = play_round()
+        for process in processes:
+            process.join(timeout=5)
+
+        self.assertEqual(set(third), {'rendered-1'})
+        self.assertTrue(set(second) <= {first[0], 'rendered-1'})
+        rendered = 0
+        while not renders.empty():
+            rendered += renders.get()
+        # По одному рендеру на версию, а не на процесс.
+        self.assertEqual(rendered, 2)
+
+    def test_counters_survive_concurrent_processes(self):
+        """Одновременные увеличения счётчика не теряются."""
+        context = multiprocessing.get_context('fork')
+        barrier = context.Barrier(WORKERS)
+        processes = [
+            context.Process(target=count_hits, args=(barrier, 50))
+            for _ in range(WORKERS)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(timeout=10)
+        self.assertEqual(cache.get_stats('index')['hits'], WORKERS * 50)
+
+    def test_stale_page_served_while_locked(self):
+        """Пока страницу рисует другой процесс, отдаётся прежняя версия."""
+        self.assertEqual(cache.get_or_render('index', '', lambda: 'v1'), 'v1')
+        cache.bump_version('index')
+        django_cache.add(cache.LOCK_KEY.format(
+            name='index', cursor=cache._digest('')
+        ), 1)
+        self.assertEqual(cache.get_or_render('index', '', lambda: 'v2'), 'v1')
+        self.assertEqual(cache.get_stats('index')['stale'], 1)
+
+
+class FollowFeedCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.post = Post.objects.create(author=cls.author, text='Первый')
+
+    def setUp(self):
+        django_cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+        self.url = reverse('posts:follow_index')
+
+    def test_pages_are_cached_per_user(self):
+        """Повторный запрос ленты подписок берётся из кэша."""
+        self.client.get(self.url)
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Первый')
+        self.assertEqual(
+            cache.get_stats('follow'), {'hits': 1, 'misses': 1, 'stale': 0}
+        )
+
+    @override_settings(FEED_INVALIDATION_BATCH_SIZE=2)
+    def test_bump_versions_in_batches(self):
+        """Массовая инвалидация доходит до всех лент пачками."""
+        names = [cache.follow_feed_name(pk) for pk in range(5)]
+        before = [cache.get_version(name) for name in names]
+        cache.bump_versions(names)
+        after = [cache.get_version(name) for name in names]
+        self.assertEqual(after, [version + 1 for version in before])
+
+
+class FollowFeedInvalidationTest(TransactionTestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.reader = User.objects.create_user(username='reader')
+        self.bystander = User.objects.create_user(username='bystander')
+        Follow.objects.create(user=self.reader, author=self.author)
+        Post.objects.create(author=self.author, text='Первый')
+        self.client = Client()
+        self.client.force_login(self.reader)
+        self.url = reverse('posts:follow_index')
+
+    def feed_version(self, user):
+        return cache.get_version(cache.follow_feed_name(user.pk))
+
+    def test_new_post_invalidates_only_followers(self):
+        """Новый пост сбрасывает ленты подписчиков автора, и только их."""
+        self.client.get(self.url)
+        bystander = self.feed_version(self.bystander)
+        Post.objects.create(author=self.author, text='Второй')
+        self.assertContains(self.client.get(self.url), 'Второй')
+        self.assertEqual(self.feed_version(self.bystander), bystander)
+
+    def test_versions_bump_after_commit(self):
+        """До фиксации транзакции версия ленты не меняется."""
+        version = cache.get_version('index')
+        with transaction.atomic():
+            Post.objects.create(author=self.author, text='Второй')
+            self.assertEqual(cache.get_version('index'), version)
+        self.assertEqual(cache.get_version('index'), version + 1)
+
+    def test_unfollow_invalidates_reader(self):
+        """Отписка сразу убирает посты автора из ленты."""
+        self.client.get(self.url)
+        self.client.get(reverse(
+            'posts:profile_unfollow', args=(self.author.username,)
+        ))
+        self.assertNotContains(self.client.get(self.url), 'Первый')
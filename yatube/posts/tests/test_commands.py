@@ -0,0 +1,187 @@
+import glob
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from posts.models import (
+    Comment, Follow, Group, ImportCheckpoint, Post, TimelineEntry,
+)
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+class SeedCommandTest(TestCase):
+    def test_seed_creates_consistent_data(self):
+        """seed_yatube создаёт данные и приводит производные в порядок."""
+        call_command(
+            'seed_yatube', users=6, groups=2, posts=30, comments=15,
+            follows=8, images=0, batch_size=7, stdout=StringIO(),
+        )
+        self.assertEqual(User.objects.count(), 6)
+        self.assertEqual(Group.objects.count(), 2)
+        self.assertEqual(Post.objects.count(), 30)
+        self.assertEqual(Comment.objects.count(), 15)
+        self.assertEqual(Follow.objects.count(), 8)
+        self.assertGreater(
+            Post.objects.values('pub_date').distinct().count(), 1
+        )
+        for user in User.objects.select_related('stats'):
+            self.assertEqual(
+                user.stats.posts_count,
+                Post.objects.filter(author=user).count(),
+            )
+        follow = Follow.objects.first()
+        self.assertEqual(
+            TimelineEntry.objects.filter(
+                user=follow.user, post__author=follow.author
+            ).count(),
+            Post.objects.filter(author=follow.author).count(),
+        )
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ImportPostsCommandTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'posts.jsonl')
+
+    def write(self, rows, mode='w'):
+        with open(self.path, mode, encoding='utf-8') as file:
+            for row in rows:
+                file.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+    def run_import(self, *args, **options):
+        call_command(
+            'import_posts', self.path, *args, batch_size=2,
+            no_thumbnails=True, stdout=StringIO(), stderr=StringIO(),
+            **options,
+        )
+
+    def test_import_creates_posts_comments_and_groups(self):
+        Image.new('RGB', (4, 4)).save(os.path.join(self.directory, 'a.png'))
+        self.write([
+            {'author': 'author', 'text': 'первый', 'group': 'old',
+             'group_title': 'Старая группа', 'image': 'a.png',
+             'pub_date': '2020-01-02T03:04:05+00:00',
+             'comments': [{'author': 'reader', 'text': 'ответ',
+                           'created': '2020-01-03T00:00:00+00:00'}]},
+            {'author': 'author', 'text': 'второй', 'group': 'old'},
+            {'author': 'stranger', 'text': 'пропустится'},
+        ])
+        self.run_import(images_dir=self.directory)
+        first = Post.objects.get(text='первый')
+        self.assertEqual(first.pub_date.year, 2020)
+        self.assertEqual(first.updated_at, first.pub_date)
+        self.assertTrue(first.image.name.startswith('posts/a'))
+        self.assertEqual(first.comments_count, 1)
+        self.assertEqual(first.comments.get().created.day, 3)
+        self.assertEqual(Post.objects.count(), 2)
+        group = Group.objects.get(slug='old')
+        self.assertEqual(group.title, 'Старая группа')
+        self.assertEqual(group.posts_count, 2)
+        self.assertEqual(self.author.stats.posts_count, 2)
+
+    def test_import_shifts_group_counters_without_recount(self):
+        group = Group.objects.create(title='Группа', slug='old')
+        existing = Post.objects.create(
+            author=self.author, group=group, text='уже был'
+        )
+        self.write([
+            {'author': 'author', 'text': f'пост {number}', 'group': 'old',
+             'pub_date': f'2020-01-0{number}T00:00:00+00:00'}
+            for number in range(1, 4)
+        ])
+        with mock.patch(
+            'posts.management.commands.import_posts.counters.refresh_groups'
+        ) as refresh_groups:
+            self.run_import()
+        refresh_groups.assert_not_called()
+        group.refresh_from_db()
+        self.assertEqual(group.posts_count, 4)
+        self.assertEqual(group.last_post_at, existing.pub_date)
+
+    def test_import_resumes_from_checkpoint(self):
+        self.write([{'author': 'author', 'text': f'пост {number}'}
+                    for number in range(3)])
+        self.run_import()
+        self.write([{'author': 'author', 'text': 'новый'}], mode='a')
+        self.run_import()
+        self.assertEqual(Post.objects.count(), 4)
+        self.assertEqual(Post.objects.filter(text='новый').count(), 1)
+        self.run_import(restart=True)
+        self.assertEqual(Post.objects.count(), 8)
+
+    def test_checkpoint_commits_with_its_batch(self):
+        """Обрыв посреди пачки не оставляет её строк без отметки."""
+        self.write([{'author': 'author', 'text': f'пост {number}'}
+                    for number in range(4)])
+        with mock.patch(
+            'posts.management.commands.import_posts.counters.bump_user',
+            side_effect=[None, RuntimeError('обрыв')],
+        ), self.assertRaises(RuntimeError):
+            self.run_import()
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(ImportCheckpoint.objects.get().rows, 2)
+        self.run_import()
+        self.assertEqual(
+            sorted(Post.objects.values_list('text', flat=True)),
+            [f'пост {number}' for number in range(4)],
+        )
+
+    def test_comments_attach_to_their_posts(self):
+        Post.objects.create(author=self.author, text='уже был')
+        self.write([
+            {'author': 'author', 'text': f'пост {number}',
+             'comments': [{'author': 'reader', 'text': f'к {number}'}]
+             * number}
+            for number in range(1, 4)
+        ])
+        self.run_import()
+        for number in range(1, 4):
+            post = Post.objects.get(text=f'пост {number}')
+            self.assertEqual(
+                set(post.comments.values_list('text', flat=True)),
+                {f'к {number}'},
+            )
+            self.assertEqual(post.comments.count(), number)
+
+    def test_skipped_rows_leave_no_images(self):
+        Image.new('RGB', (4, 4)).save(os.path.join(self.directory, 'b.png'))
+        self.write([
+            {'author': 'stranger', 'text': 'пропустится', 'image': 'b.png'},
+            {'author': 'author', 'text': '', 'image': 'b.png'},
+        ])
+        self.run_import(images_dir=self.directory)
+        self.assertFalse(Post.objects.exists())
+        self.assertEqual(
+            glob.glob(os.path.join(TEMP_MEDIA_ROOT, 'posts', 'b*')), []
+        )
+
+    def test_create_users_option(self):
+        self.write([{'author': 'newcomer', 'text': 'привет'}])
+        self.run_import(create_users=True)
+        newcomer = User.objects.get(username='newcomer')
+        self.assertFalse(newcomer.has_usable_password())
+        self.assertEqual(Post.objects.get().author, newcomer)
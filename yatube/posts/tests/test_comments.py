@@ -0,0 +1,76 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+
+@override_settings(COMMENTS_PER_PAGE=3)
+class CommentPaginationTest(TestCase):
+    """Комментарии поста отдаются страницами по ключу (created, pk)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(author=cls.author, text='text')
+        Comment.objects.bulk_create(
+            Comment(post=cls.post, author=cls.author, text=f'comment-{number}')
+            for number in range(7)
+        )
+        cls.comments = list(
+            Comment.objects.filter(post=cls.post).order_by('created', 'pk')
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.fragment_url = reverse(
+            'posts:comments', kwargs={'post_id': self.post.pk}
+        )
+
+    def test_post_detail_shows_first_page(self):
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        )
+        page = response.context['comments']
+        self.assertEqual(list(page), self.comments[:3])
+        self.assertContains(response, 'data-comments-more')
+
+    def test_json_walks_all_comments_in_order(self):
+        seen, cursor = [], ''
+        for _ in range(3):
+            data = self.client.get(
+                self.fragment_url, {'cursor': cursor, 'format': 'json'}
+            ).json()
+            seen += [comment['id'] for comment in data['comments']]
+            cursor = data['next_cursor']
+        self.assertEqual(seen, [comment.pk for comment in self.comments])
+        self.assertIsNone(cursor)
+
+    def test_fragment_links_to_next_page(self):
+        response = self.client.get(self.fragment_url)
+        page = response.context['comments']
+        self.assertTemplateUsed(response, 'posts/includes/comment_list.html')
+        self.assertContains(
+            response, f'?cursor={page.paginator.next_cursor}'
+        )
+        self.assertNotContains(response, '<form')
+
+    def test_first_page_link_only_on_post_detail(self):
+        cursor = self.client.get(
+            self.fragment_url
+        ).context['comments'].paginator.next_cursor
+        fragment = self.client.get(self.fragment_url, {'cursor': cursor})
+        self.assertNotContains(fragment, 'К первым комментариям')
+        detail = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+            {'comments': cursor},
+        )
+        self.assertContains(detail, 'К первым комментариям')
+
+    def test_unknown_post_gives_404(self):
+        response = self.client.get(
+            reverse('posts:comments', kwargs={'post_id': self.post.pk + 1})
+        )
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,129 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from posts import cache as feed_cache
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class NotModifiedAssertions:
+    def assert_not_modified(self, url, client=None):
+        client = client or self.client
+        # Первый ответ может выставить CSRF-cookie, а она входит в ETag.
+        client.get(url)
+        etag = client.get(url)['ETag']
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(response.templates)
+        return etag
+
+    def assert_modified(self, url, etag, client=None):
+        response = (client or self.client).get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class ConditionalGetTest(NotModifiedAssertions, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Пост',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def test_stale_page_has_no_etag(self):
+        """Прежнюю версию ленты нельзя закрепить за новым ETag."""
+        url = reverse('posts:index')
+        self.client.get(url)
+        feed_cache.bump_version('index')
+        # Новую версию будто бы рисует другой процесс.
+        cache.add(feed_cache.LOCK_KEY.format(
+            name='index', cursor=feed_cache._digest('')
+        ), 1)
+        response = self.client.get(url)
+        self.assertContains(response, 'Пост')
+        self.assertFalse(response.has_header('ETag'))
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_not_modified_skips_database(self):
+        """Для ленты index ответ 304 не ходит в базу."""
+        url = reverse('posts:index')
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_post_edit_changes_validators(self):
+        """Правка поста меняет ETag и Last-Modified страницы поста."""
+        url = reverse('posts:post_detail', args=(self.post.pk,))
+        first = self.client.get(url)
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified']
+        )
+        self.assertEqual(response.status_code, 304)
+        author_client = Client()
+        author_client.force_login(self.author)
+        author_client.post(
+            reverse('posts:post_edit', args=(self.post.pk,)),
+            {'text': 'Исправленный пост'},
+        )
+        self.assert_modified(url, first['ETag'])
+
+    def test_comment_changes_post_etag(self):
+        """Новый комментарий меняет ETag страницы поста."""
+        url = reverse('posts:post_detail', args=(self.post.pk,))
+        etag = self.assert_not_modified(url, self.reader_client)
+        self.reader_client.post(
+            reverse('posts:add_comment', args=(self.post.pk,)),
+            {'text': 'Комментарий'},
+        )
+        self.assertTrue(Comment.objects.exists())
+        self.assert_modified(url, etag, self.reader_client)
+
+    def test_follow_changes_profile_etag(self):
+        """Подписка меняет счётчики и ETag профиля."""
+        url = reverse('posts:profile', args=(self.author.username,))
+        etag = self.assert_not_modified(url, self.reader_client)
+        self.reader_client.get(
+            reverse('posts:profile_follow', args=(self.author.username,))
+        )
+        self.assertTrue(Follow.objects.exists())
+        self.assert_modified(url, etag, self.reader_client)
+
+    def test_etag_depends_on_user(self):
+        """ETag гостя не подходит вошедшему пользователю."""
+        url = reverse('posts:index')
+        etag = self.client.get(url)['ETag']
+        self.assert_modified(url, etag, self.reader_client)
+
+
+class ConditionalInvalidationTest(NotModifiedAssertions, TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание',
+        )
+        Post.objects.create(author=self.author, group=self.group, text='Пост')
+
+    def test_feeds_answer_not_modified(self):
+        """Неизменившиеся ленты отдают 304 без шаблонов и запросов."""
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(self.group.slug,)),
+        ):
+            with self.subTest(url=url):
+                etag = self.assert_not_modified(url)
+                Post.objects.create(author=self.author, text='Новый')
+                self.assert_modified(url, etag)
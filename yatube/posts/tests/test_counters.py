@@ -0,0 +1,98 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Post, UserStats
+
+User = get_user_model()
+
+
+class CountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def stats(self, user):
+        return UserStats.objects.get(user=user)
+
+    def test_post_and_comment_counters(self):
+        """Счётчики постов и комментариев следуют за созданием
+        и удалением."""
+        post = Post.objects.create(author=self.author, text='пост')
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+        self.client.post(
+            reverse('posts:add_comment', kwargs={'post_id': post.pk}),
+            data={'text': 'комментарий'},
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        Comment.objects.get().delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+        post.delete()
+        self.assertEqual(self.stats(self.author).posts_count, 0)
+
+    def test_follow_counters(self):
+        """Подписка и отписка меняют счётчики обеих сторон."""
+        url = reverse('posts:profile_follow', kwargs={'username': 'author'})
+        self.client.get(url)
+        self.client.get(url)
+        self.assertEqual(self.stats(self.reader).following_count, 1)
+        self.assertEqual(self.stats(self.author).followers_count, 1)
+        self.client.get(
+            reverse('posts:profile_unfollow', kwargs={'username': 'author'})
+        )
+        self.assertEqual(self.stats(self.reader).following_count, 0)
+        self.assertEqual(self.stats(self.author).followers_count, 0)
+
+    def test_profile_uses_counters(self):
+        Post.objects.create(author=self.author, text='пост')
+        response = self.client.get(
+            reverse('posts:profile', kwargs={'username': 'author'})
+        )
+        self.assertEqual(response.context['posts_count'], 1)
+
+    def test_deleting_user_keeps_counters_consistent(self):
+        """Удаление автора не оставляет висячих счётчиков."""
+        author = User.objects.create_user(username='leaving')
+        Post.objects.create(author=author, text='пост')
+        self.client.get(
+            reverse('posts:profile_follow', kwargs={'username': 'leaving'})
+        )
+        author_pk = author.pk
+        author.delete()
+        self.assertEqual(self.stats(self.reader).following_count, 0)
+        self.assertFalse(UserStats.objects.filter(user=author_pk).exists())
+
+    def test_delete_after_drift_does_not_go_negative(self):
+        """Удаление при счётчиках, ушедших в ноль, не падает."""
+        post = Post.objects.create(author=self.author, text='пост')
+        comment = Comment.objects.create(
+            post=post, author=self.reader, text='к'
+        )
+        Post.objects.update(comments_count=0)
+        UserStats.objects.update(posts_count=0)
+        comment.delete()
+        post.delete()
+        self.assertEqual(self.stats(self.author).posts_count, 0)
+
+    def test_reconcile_counters_repairs_drift(self):
+        """Команда reconcile_counters чинит разошедшиеся счётчики."""
+        post = Post.objects.create(author=self.author, text='пост')
+        Comment.objects.create(post=post, author=self.reader, text='к')
+        Post.objects.update(comments_count=10)
+        UserStats.objects.all().delete()
+        call_command('reconcile_counters', stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+        self.assertEqual(self.stats(self.reader).posts_count, 0)
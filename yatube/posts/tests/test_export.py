@@ -0,0 +1,113 @@
+import csv
+import json
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import export
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ExportTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.author, group=cls.group, text=f'Пост {number}'
+            )
+            for number in range(5)
+        ]
+        Comment.objects.create(
+            post=cls.posts[0], author=cls.reader, text='Комментарий'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+
+    def read(self, name):
+        with open(f'{self.output_dir}/{name}', encoding='utf-8') as file:
+            return file.read()
+
+    def test_rows_walk_all_batches_in_pk_order(self):
+        records = list(export.model_rows(Post.objects.all(), batch_size=2))
+        self.assertEqual(
+            [record['id'] for record in records],
+            [post.pk for post in self.posts],
+        )
+
+    def test_command_writes_jsonl_per_model(self):
+        call_command(
+            'export_yatube', output_dir=self.output_dir, stdout=StringIO()
+        )
+        posts = [
+            json.loads(line)
+            for line in self.read('post.jsonl').splitlines()
+        ]
+        self.assertEqual(len(posts), 5)
+        self.assertEqual(posts[0]['text'], 'Пост 0')
+        self.assertEqual(
+            posts[0]['pub_date'], self.posts[0].pub_date.isoformat()
+        )
+        self.assertEqual(len(self.read('follow.jsonl').splitlines()), 1)
+
+    def test_command_writes_csv_with_header(self):
+        call_command(
+            'export_yatube', 'group', format='csv',
+            output_dir=self.output_dir, stdout=StringIO(),
+        )
+        rows = list(csv.reader(StringIO(self.read('group.csv'))))
+        self.assertEqual(rows[0], list(export.EXPORTS['group'][1]))
+        self.assertEqual(rows[1][1:], ['Группа', 'group', 'Описание'])
+
+    def test_since_exports_only_newer_rows(self):
+        since = self.posts[0].pub_date - timedelta(hours=1)
+        old = [post.pk for post in self.posts[:3]]
+        Post.objects.filter(pk__in=old).update(
+            pub_date=since - timedelta(days=1)
+        )
+        out = StringIO()
+        call_command(
+            'export_yatube', 'post', since=since.isoformat(),
+            output_dir=self.output_dir, stdout=out,
+        )
+        exported = [
+            json.loads(line)['id']
+            for line in self.read('post.jsonl').splitlines()
+        ]
+        self.assertEqual(exported, [post.pk for post in self.posts[3:]])
+        self.assertIn('--since', out.getvalue())
+
+    def test_admin_action_streams_selected_rows(self):
+        admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        client = Client()
+        client.force_login(admin)
+        response = client.post(
+            reverse('admin:posts_post_changelist'),
+            {
+                'action': 'export_jsonl',
+                '_selected_action': [self.posts[1].pk, self.posts[2].pk],
+            },
+        )
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(
+            [json.loads(line)['id'] for line in lines],
+            [self.posts[1].pk, self.posts[2].pk],
+        )
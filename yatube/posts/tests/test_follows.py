@@ -0,0 +1,159 @@
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import follows
+from posts.models import Follow, Post, TimelineEntry, UserStats
+
+User = get_user_model()
+
+
+class FollowServiceTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create_user(username='reader')
+        cls.authors = [
+            User.objects.create_user(username=f'author-{number}')
+            for number in range(3)
+        ]
+        for author in cls.authors:
+            Post.objects.create(author=author, text=f'пост {author}')
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def stats(self, user):
+        return UserStats.objects.get(user=user)
+
+    def test_follow_is_idempotent(self):
+        author = self.authors[0]
+        self.assertTrue(follows.follow(self.reader, author))
+        self.assertFalse(follows.follow(self.reader, author))
+        self.assertFalse(follows.follow(self.reader, self.reader))
+        self.assertEqual(Follow.objects.count(), 1)
+        self.assertEqual(self.stats(author).followers_count, 1)
+
+    def test_database_rejects_self_follow(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Follow.objects.create(user=self.reader, author=self.reader)
+
+    def test_ajax_follow_returns_json(self):
+        url = reverse(
+            'posts:profile_follow', kwargs={'username': 'author-0'}
+        )
+        response = self.client.get(url, HTTP_ACCEPT='application/json')
+        self.assertEqual(
+            response.json(), {'following': True, 'followers_count': 1}
+        )
+        response = self.client.get(
+            reverse('posts:profile_unfollow',
+                    kwargs={'username': 'author-0'}),
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+        self.assertEqual(
+            response.json(), {'following': False, 'followers_count': 0}
+        )
+
+    def test_ajax_follow_is_csrf_protected_post(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.reader)
+        url = reverse('posts:profile_follow', kwargs={'username': 'author-0'})
+        profile = client.get(
+            reverse('posts:profile', kwargs={'username': 'author-0'})
+        )
+        token = str(profile.context['csrf_token'])
+        self.assertContains(profile, token)
+        self.assertEqual(
+            client.post(url, HTTP_ACCEPT='application/json').status_code, 403
+        )
+        response = client.post(
+            url, HTTP_ACCEPT='application/json', HTTP_X_CSRFTOKEN=token
+        )
+        self.assertEqual(response.json()['following'], True)
+        self.assertIn('Accept', response['Vary'])
+        self.assertIn('Accept', client.get(url)['Vary'])
+
+    def post_bulk(self, payload):
+        return self.client.post(
+            reverse('posts:follow_bulk'), json.dumps(payload),
+            content_type='application/json',
+        )
+
+    def test_bulk_follow_and_unfollow(self):
+        response = self.post_bulk({
+            'follow': ['author-0', 'author-1', 'reader', 'ghost'],
+        })
+        self.assertEqual(
+            response.json(),
+            {'followed': 2, 'unfollowed': 0, 'unknown': ['ghost']},
+        )
+        self.assertEqual(self.stats(self.reader).following_count, 2)
+        self.assertEqual(self.stats(self.authors[1]).followers_count, 1)
+        feed = self.client.get(reverse('posts:follow_index'))
+        self.assertEqual(len(feed.context['page_obj']), 2)
+        response = self.post_bulk({
+            'follow': ['author-1', 'author-2'], 'unfollow': ['author-0'],
+        })
+        self.assertEqual(response.json()['followed'], 1)
+        self.assertEqual(response.json()['unfollowed'], 1)
+        self.assertEqual(
+            set(Follow.objects.values_list('author__username', flat=True)),
+            {'author-1', 'author-2'},
+        )
+        self.assertEqual(self.stats(self.reader).following_count, 2)
+
+    def test_follow_many_counts_only_its_own_inserts(self):
+        follows.follow(self.reader, self.authors[0])
+        UserStats.objects.filter(user=self.authors[2]).delete()
+        ids = [author.pk for author in self.authors]
+        self.assertEqual(follows.follow_many(self.reader.pk, ids), 2)
+        self.assertEqual(follows.follow_many(self.reader.pk, ids), 0)
+        self.assertEqual(self.stats(self.reader).following_count, 3)
+        for author in self.authors:
+            with self.subTest(author=author.username):
+                self.assertEqual(self.stats(author).followers_count, 1)
+
+    def test_follow_many_query_count_does_not_grow_with_authors(self):
+        UserStats.objects.get_or_create(user=self.reader)
+        first, *others = [author.pk for author in self.authors]
+        with CaptureQueriesContext(connection) as one:
+            follows.follow_many(self.reader.pk, [first])
+        with CaptureQueriesContext(connection) as many:
+            follows.follow_many(self.reader.pk, others)
+        self.assertEqual(len(many), len(one))
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.reader).count(), 3
+        )
+
+    @override_settings(BULK_FOLLOW_LIMIT=2)
+    def test_bulk_follow_rejects_bad_requests(self):
+        for payload in (
+            {'follow': ['a', 'b', 'c']}, {'follow': [1]}, [],
+            {'follow': 'a0'}, {'unfollow': {'author-0': True}},
+        ):
+            with self.subTest(payload=payload):
+                self.assertEqual(self.post_bulk(payload).status_code, 400)
+
+    def test_bulk_follow_command(self):
+        newcomer = User.objects.create_user(username='newcomer')
+        follows.follow(self.reader, self.authors[2])
+        call_command(
+            'bulk_follow', 'author-0', 'author-1', '--without-follows',
+            stdout=StringIO(),
+        )
+        self.assertEqual(
+            Follow.objects.filter(user=newcomer).count(), 2
+        )
+        self.assertEqual(Follow.objects.filter(user=self.reader).count(), 1)
+        call_command(
+            'bulk_follow', 'author-0', '--user', 'newcomer', '--unfollow',
+            stdout=StringIO(),
+        )
+        self.assertEqual(Follow.objects.filter(user=newcomer).count(), 1)
@@ -0,0 +1,154 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class GroupCountersTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Первая', slug='first', description='описание'
+        )
+        cls.other = Group.objects.create(
+            title='Вторая', slug='second', description='описание'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def assertCounters(self, group, count, last_post_at):
+        group.refresh_from_db()
+        self.assertEqual(group.posts_count, count)
+        self.assertEqual(group.last_post_at, last_post_at)
+
+    def test_counters_follow_create_move_and_delete(self):
+        first = Post.objects.create(
+            author=self.author, group=self.group, text='первый'
+        )
+        second = Post.objects.create(
+            author=self.author, group=self.group, text='второй'
+        )
+        self.assertCounters(self.group, 2, second.pub_date)
+        self.client.post(
+            reverse('posts:post_edit', kwargs={'post_id': second.pk}),
+            data={'text': 'второй', 'group': self.other.pk},
+        )
+        self.assertCounters(self.group, 1, first.pub_date)
+        self.assertCounters(self.other, 1, second.pub_date)
+        first.delete()
+        self.assertCounters(self.group, 0, None)
+
+    def test_edit_knows_group_without_extra_query(self):
+        post = Post.objects.create(
+            author=self.author, group=self.group, text='пост'
+        )
+        post = Post.objects.get(pk=post.pk)
+        post.text = 'правка'
+        with self.assertNumQueries(1):
+            post.save()
+        post.group = self.other
+        post.save()
+        self.assertCounters(self.group, 0, None)
+        self.assertCounters(self.other, 1, post.pub_date)
+        # Повторное сохранение того же объекта не двигает счётчики.
+        post.save()
+        self.assertCounters(self.other, 1, post.pub_date)
+
+    def test_move_and_delete_after_drift(self):
+        first, second = (
+            Post.objects.create(
+                author=self.author, group=self.group, text=text
+            )
+            for text in ('первый', 'второй')
+        )
+        Group.objects.update(posts_count=0)
+        second.group = self.other
+        second.save()
+        first.delete()
+        self.assertCounters(self.group, 0, None)
+        self.assertCounters(self.other, 1, second.pub_date)
+
+    def test_reconcile_repairs_group_drift(self):
+        post = Post.objects.create(
+            author=self.author, group=self.group, text='пост'
+        )
+        Group.objects.update(
+            posts_count=7, last_post_at=post.pub_date - timedelta(days=1)
+        )
+        call_command('reconcile_counters', stdout=StringIO())
+        self.assertCounters(self.group, 1, post.pub_date)
+        self.assertCounters(self.other, 0, None)
+
+
+class GroupPagesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='описание'
+        )
+        for number in range(25):
+            Post.objects.create(
+                author=cls.author, group=cls.group, text=f'пост {number}'
+            )
+        cls.url = reverse('posts:group_list', kwargs={'slug': 'group'})
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_group_feed_pages_through_all_posts(self):
+        seen, cursor = [], ''
+        while cursor is not None:
+            page = self.client.get(self.url, {'cursor': cursor}).context[
+                'page_obj']
+            seen += [post.pk for post in page]
+            cursor = page.paginator.next_cursor
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(len(set(seen)), 25)
+
+    def test_group_lookup_is_cached(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+
+
+class GroupInvalidationTest(TransactionTestCase):
+    """Кэш групп сбрасывается после фиксации транзакции, поэтому здесь
+    каждая запись действительно фиксируется."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.author = User.objects.create_user(username='author')
+        self.group = Group.objects.create(
+            title='Группа', slug='group', description='описание'
+        )
+        Post.objects.create(author=self.author, group=self.group, text='пост')
+        self.url = reverse('posts:group_list', kwargs={'slug': 'group'})
+
+    def test_renamed_group_is_not_served_from_cache(self):
+        self.client.get(self.url)
+        self.group.title = 'Новое имя'
+        self.group.save()
+        self.assertContains(self.client.get(self.url), 'Новое имя')
+
+    def test_directory_is_cached_and_follows_new_posts(self):
+        url = reverse('posts:groups')
+        self.assertContains(self.client.get(url), 'Записей: 1')
+        with self.assertNumQueries(0):
+            self.client.get(url)
+        Post.objects.create(author=self.author, group=self.group, text='ещё')
+        self.assertContains(self.client.get(url), 'Записей: 2')
@@ -1,7 +1,12 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-from ..models import Group, Post
+from ..models import Comment, Follow, Group, Post
 
 
 User = get_user_model()
@@ -33,3 +38,82 @@ class PostModelTest(TestCase):
         group = PostModelTest.group
         expected_object_name = group.title
         self.assertEqual(expected_object_name, str(group))
+
+
+class QueryPlanTest(TestCase):
+    """Запросы лент идут по составным индексам, без сортировки
+    во временном B-дереве."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        for number in range(settings.NUMBER_OF_POST_PER_PAGE + 1):
+            Post.objects.create(
+                author=cls.user,
+                group=cls.group,
+                text=f'Тестовый пост {number}',
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def get_plans(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        plans = []
+        for query in queries.captured_queries:
+            sql = query['sql']
+            if 'ORDER BY' not in sql:
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                plans.append(
+                    (sql, ' '.join(row[-1] for row in cursor.fetchall()))
+                )
+        return response, plans
+
+    def assert_uses_index(self, url):
+        response, plans = self.get_plans(url)
+        cursor = response.context['page_obj'].paginator.next_cursor
+        plans += self.get_plans(url, cursor=cursor)[1]
+        self.assertTrue(plans)
+        for sql, plan in plans:
+            with self.subTest(url=url, sql=sql):
+                self.assertIn('USING INDEX', plan)
+                self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_feed_queries_use_indexes(self):
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user}),
+        )
+        for url in urls:
+            self.assert_uses_index(url)
+
+    def test_follow_queries_use_unique_index(self):
+        follower = User.objects.create_user(username='follower')
+        Follow.objects.create(user=follower, author=self.user)
+        with connection.cursor() as cursor:
+            sql, params = Follow.objects.filter(
+                user=follower, author=self.user
+            ).query.sql_with_params()
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+        self.assertIn('INDEX', plan)
+        self.assertIn('user_id=? AND author_id=?', plan)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Follow.objects.create(user=follower, author=self.user)
+
+    def test_comment_queries_use_index(self):
+        post = Post.objects.first()
+        plan = Comment.objects.filter(post=post).order_by(
+            'created', 'pk').explain()
+        self.assertIn('comment_post_created_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
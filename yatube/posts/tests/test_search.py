@@ -0,0 +1,92 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import search
+from posts.models import Post
+
+User = get_user_model()
+
+
+class SearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader')
+        cls.rare = Post.objects.create(
+            author=cls.user, text='Кот спит <b>на</b> диване',
+        )
+        cls.frequent = Post.objects.create(
+            author=cls.user, text='Кот, кот и ещё раз кот',
+        )
+        cls.other = Post.objects.create(
+            author=cls.user, text='Собака гуляет во дворе',
+        )
+
+    def search(self, query, **params):
+        return self.client.get(
+            reverse('posts:search'), {'q': query, **params}
+        )
+
+    def test_results_are_ranked(self):
+        """Выдача упорядочена по релевантности."""
+        response = self.search('кот')
+        self.assertEqual(
+            list(response.context['page_obj']),
+            [self.frequent, self.rare],
+        )
+
+    def test_prefix_and_highlight(self):
+        """Поиск по префиксу: совпадения подсвечены, HTML экранирован."""
+        response = self.search('див')
+        post = response.context['page_obj'][0]
+        self.assertEqual(post, self.rare)
+        self.assertEqual(
+            post.highlighted,
+            'Кот спит &lt;b&gt;на&lt;/b&gt; <mark>диване</mark>',
+        )
+
+    def test_index_follows_post_changes(self):
+        """Триггеры обновляют индекс при правке и удалении поста."""
+        self.other.text = 'Кошка гуляет сама по себе'
+        self.other.save()
+        self.assertIn(self.other, search.matching(Post.objects, 'кошка'))
+        self.assertFalse(search.matching(Post.objects, 'собака').exists())
+        self.other.delete()
+        self.assertFalse(search.matching(Post.objects, 'кошка').exists())
+
+    def test_query_syntax_is_escaped(self):
+        """Операторы FTS5 во вводе не ломают запрос."""
+        for query in ('кот AND (', '"', 'NEAR(кот', '*', ''):
+            with self.subTest(query=query):
+                self.assertEqual(self.search(query).status_code, 200)
+
+    def test_pagination_keeps_query(self):
+        """Страницы поиска идут по курсору и сохраняют запрос."""
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'Пёс номер {number}')
+            for number in range(settings.NUMBER_OF_POST_PER_PAGE + 3)
+        )
+        response = self.search('пёс')
+        paginator = response.context['page_obj'].paginator
+        self.assertContains(
+            response, f'?q=%D0%BF%D1%91%D1%81&amp;cursor='
+            f'{paginator.next_cursor}'
+        )
+        second = self.search('пёс', cursor=paginator.next_cursor)
+        first_ids = {post.pk for post in response.context['page_obj']}
+        second_ids = {post.pk for post in second.context['page_obj']}
+        self.assertEqual(len(second_ids), 3)
+        self.assertFalse(first_ids & second_ids)
+
+    def test_admin_uses_index(self):
+        """Поиск в админке идёт через полнотекстовый индекс."""
+        admin = User.objects.create_superuser('admin', 'a@a.ru', 'pass')
+        client = Client()
+        client.force_login(admin)
+        response = client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'собака'}
+        )
+        self.assertEqual(
+            list(response.context['cl'].result_list), [self.other]
+        )
@@ -0,0 +1,135 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from posts import follows, suggestions
+from posts.models import Follow, FollowSuggestion
+
+User = get_user_model()
+
+
+class ScoreTest(TestCase):
+    def test_friends_of_friends_and_co_followers_rank(self):
+        # 1 читает 2 и 3; 2 и 3 читают 4, 3 читает ещё 5;
+        # 6 тоже читает 2 и 3, а кроме них 7.
+        graph = suggestions.Graph([
+            (1, 2), (1, 3), (2, 4), (3, 4), (3, 5),
+            (6, 2), (6, 3), (6, 7),
+        ])
+        ranked = [author for author, _ in suggestions.score(graph, 1, 5)]
+        # 4 читают оба автора читателя, 7 — похожий читатель,
+        # 5 — только один автор.
+        self.assertEqual(ranked, [4, 7, 5])
+
+    def test_reader_without_follows_gets_nothing(self):
+        graph = suggestions.Graph([(2, 3)])
+        self.assertEqual(suggestions.score(graph, 1, 5), [])
+
+
+class SuggestionStorageTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create_user(username='reader')
+        cls.friend = User.objects.create_user(username='friend')
+        cls.authors = [
+            User.objects.create_user(username=f'author-{number}')
+            for number in range(3)
+        ]
+        Follow.objects.create(user=cls.reader, author=cls.friend)
+        for author in cls.authors:
+            Follow.objects.create(user=cls.friend, author=author)
+
+    def setUp(self):
+        cache.clear()
+
+    def suggested(self, user):
+        return [item.author for item in suggestions.for_user(user)]
+
+    def test_rebuild_stores_suggestions(self):
+        self.assertEqual(suggestions.rebuild(), 2)
+        self.assertEqual(self.suggested(self.reader), self.authors)
+        self.assertEqual(self.suggested(self.friend), [])
+
+    def test_refresh_drops_followed_author(self):
+        suggestions.rebuild()
+        Follow.objects.create(user=self.reader, author=self.authors[0])
+        suggestions.refresh(self.reader.pk)
+        self.assertEqual(self.suggested(self.reader), self.authors[1:])
+
+    def test_around_caps_neighbour_following(self):
+        with mock.patch.object(suggestions, 'MAX_NEIGHBOUR_FOLLOWING', 1):
+            graph = suggestions.Graph.around(self.reader.pk)
+        self.assertEqual(
+            graph.following[self.friend.pk], (self.authors[-1].pk,)
+        )
+
+    def test_block_is_cached_until_suggestions_change(self):
+        suggestions.rebuild()
+        client = Client()
+        client.force_login(self.reader)
+        url = reverse('posts:follow_index')
+        response = client.get(url)
+        self.assertContains(response, 'Кого почитать')
+        self.assertContains(response, 'author-0')
+        FollowSuggestion.objects.filter(user=self.reader).delete()
+        self.assertContains(client.get(url), 'author-0')
+        suggestions.refresh(self.reader.pk)
+        Follow.objects.filter(user=self.friend).delete()
+        suggestions.refresh(self.reader.pk)
+        self.assertNotContains(client.get(url), 'Кого почитать')
+
+
+class SuggestionSignalTest(TransactionTestCase):
+    def test_follow_refreshes_after_commit(self):
+        reader, friend, author = (
+            User.objects.create_user(username=name)
+            for name in ('reader', 'friend', 'author')
+        )
+        Follow.objects.create(user=friend, author=author)
+        Follow.objects.create(user=reader, author=friend)
+        self.assertEqual(
+            list(FollowSuggestion.objects.filter(user=reader)
+                 .values_list('author', flat=True)),
+            [author.pk],
+        )
+        author.delete()
+        self.assertFalse(FollowSuggestion.objects.exists())
+
+
+class SuggestionRefreshTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.reader = User.objects.create_user(username='reader')
+        self.friend = User.objects.create_user(username='friend')
+        self.authors = [
+            User.objects.create_user(username=f'author-{number}')
+            for number in range(3)
+        ]
+        Follow.objects.create(user=self.reader, author=self.friend)
+        for author in self.authors:
+            Follow.objects.create(user=self.friend, author=author)
+
+    def suggested(self, user):
+        return [item.author for item in suggestions.for_user(user)]
+
+    def test_follow_many_refreshes_suggestions(self):
+        suggestions.rebuild()
+        follows.follow_many(self.reader.pk, [self.authors[1].pk])
+        self.assertNotIn(self.authors[1], self.suggested(self.reader))
+
+    def test_follow_service_refreshes_once_per_call(self):
+        ids = [author.pk for author in self.authors]
+        with mock.patch.object(suggestions, 'refresh') as refresh:
+            follows.follow_many(self.reader.pk, ids)
+            follows.unfollow_many(self.reader.pk, ids)
+            follows.follow(self.reader, self.authors[0])
+            follows.unfollow(self.reader, self.authors[0])
+            follows.unfollow(self.reader, self.authors[0])
+        self.assertEqual(refresh.call_count, 4)
+        refresh.assert_called_with(self.reader.pk)
+        with mock.patch.object(suggestions, 'refresh') as refresh:
+            Follow.objects.create(user=self.friend, author=self.reader)
+        refresh.assert_called_once_with(self.friend.pk)
@@ -0,0 +1,124 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from sorl.thumbnail import get_thumbnail
+
+from posts import thumbnails
+from posts.models import Post
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x01\x00'
+    b'\x01\x00\x00\x00\x00\x21\xf9\x04'
+    b'\x01\x0a\x00\x01\x00\x2c\x00\x00'
+    b'\x00\x00\x01\x00\x01\x00\x00\x02'
+    b'\x02\x4c\x01\x00\x3b'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='painter')
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Пост с картинкой',
+            image=SimpleUploadedFile('thumb.gif', SMALL_GIF, 'image/gif'),
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        # kvstore кэширует записи в кэше Django, а его откат не чистит.
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_miss_returns_source_and_schedules(self):
+        """Без готовых миниатюр шаблон получает исходник."""
+        with mock.patch('posts.thumbnails.schedule') as schedule:
+            picture = thumbnails.picture(self.post.image)
+        self.assertEqual(picture['src'], self.post.image.url)
+        schedule.assert_called_once_with(self.post.image.name)
+
+    def test_pregenerated_thumbnail_is_served(self):
+        """После генерации шаблон получает готовую миниатюру."""
+        thumbnails.generate(self.post.image.name)
+        with mock.patch('posts.thumbnails.schedule') as schedule:
+            picture = thumbnails.picture(self.post.image)
+        schedule.assert_not_called()
+        image = get_thumbnail(
+            self.post.image,
+            thumbnails.geometry(960),
+            **thumbnails.options(thumbnails.FALLBACK_FORMAT),
+        )
+        self.assertEqual(picture['src'], image.url)
+        self.assertTrue(image.exists())
+        self.assertEqual((image.width, image.height), (960, 339))
+
+    def test_views_schedule_only_new_images(self):
+        """Генерация ставится при загрузке картинки, а не при правке."""
+        with mock.patch('posts.thumbnails.schedule') as schedule:
+            self.client.post(reverse('posts:post_create'), {
+                'text': 'Новый пост',
+                'image': SimpleUploadedFile(
+                    'new.gif', SMALL_GIF, 'image/gif'
+                ),
+            })
+            self.client.post(
+                reverse('posts:post_edit', args=(self.post.pk,)),
+                {'text': 'Правка без картинки'},
+            )
+        created = Post.objects.latest('pk')
+        schedule.assert_called_once_with(created.image.name)
+
+    def test_picture_lists_every_width(self):
+        """<picture> получает все ширины и форматы после генерации."""
+        with mock.patch('posts.thumbnails.schedule'):
+            before = thumbnails.picture(self.post.image)
+        self.assertEqual(before['src'], self.post.image.url)
+        self.assertEqual(before['sources'], [])
+
+        thumbnails.generate(self.post.image.name)
+        picture = thumbnails.picture(self.post.image)
+        self.assertEqual(
+            len(picture['sources']), len(thumbnails.FORMATS) - 1
+        )
+        for width in thumbnails.WIDTHS:
+            self.assertIn(f' {width}w', picture['srcset'])
+        self.assertTrue(picture['src'].endswith('.jpg'))
+
+    def test_picture_reads_variants_with_one_lookup(self):
+        """Готовые варианты читаются одной записью кэша, без kvstore."""
+        thumbnails.generate(self.post.image.name)
+        with mock.patch.object(
+            thumbnails.cache, 'get', wraps=thumbnails.cache.get
+        ) as cache_get, self.assertNumQueries(0):
+            picture = thumbnails.picture(self.post.image)
+        cache_get.assert_called_once()
+        self.assertIn(' 320w', picture['srcset'])
+
+    def test_feeds_render_picture(self):
+        """Ленты выводят картинку через <picture>."""
+        thumbnails.generate(self.post.image.name)
+        for url in (
+            reverse('posts:profile', args=(self.user.username,)),
+            reverse('posts:post_detail', args=(self.post.pk,)),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertContains(response, '<picture>')
+                self.assertContains(response, 'srcset=')
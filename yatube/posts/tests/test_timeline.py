@@ -0,0 +1,84 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import timeline
+from posts.models import Follow, Post, TimelineEntry
+
+User = get_user_model()
+
+
+class TimelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.old_post = Post.objects.create(author=cls.author, text='старый')
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def feed(self):
+        response = self.client.get(reverse('posts:follow_index'))
+        return list(response.context['page_obj'])
+
+    def test_follow_backfills_and_unfollow_prunes(self):
+        """Подписка догружает посты автора, отписка их убирает."""
+        self.client.get(reverse('posts:profile_follow',
+                                kwargs={'username': self.author}))
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=self.reader, post=self.old_post).exists())
+        self.assertEqual(self.feed(), [self.old_post])
+
+        self.client.get(reverse('posts:profile_unfollow',
+                                kwargs={'username': self.author}))
+        self.assertFalse(TimelineEntry.objects.filter(
+            user=self.reader).exists())
+        self.assertEqual(self.feed(), [])
+
+    def test_new_post_fans_out_to_followers(self):
+        """Новый пост попадает в ленты подписчиков, и только в них."""
+        stranger = User.objects.create_user(username='stranger')
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='новый')
+        self.assertEqual(self.feed(), [post, self.old_post])
+        self.assertFalse(TimelineEntry.objects.filter(
+            user=stranger).exists())
+
+    def test_feed_is_index_range_scan(self):
+        """Страница ленты читается по индексу, без соединения с Follow."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        plan = TimelineEntry.objects.filter(user=self.reader).order_by(
+            '-pub_date', '-pk').select_related('post').explain()
+        self.assertIn('timeline_user_pub_date_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    @override_settings(TIMELINE_MAX_FOLLOWING=0)
+    def test_huge_follow_list_falls_back_to_join(self):
+        """При большом числе подписок лента строится без материализации."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertFalse(TimelineEntry.objects.filter(
+            user=self.reader).exists())
+        self.assertEqual(self.feed(), [self.old_post])
+
+    def test_new_post_skips_followers_without_timeline(self):
+        """Подписчикам сверх порога пост в ленту не раскладывается."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        with override_settings(TIMELINE_MAX_FOLLOWING=0):
+            Post.objects.create(author=self.author, text='новый')
+            self.assertEqual(TimelineEntry.objects.filter(
+                user=self.reader).count(), 1)
+            with self.assertNumQueries(1):
+                self.assertFalse(timeline.is_materialized(self.reader))
+
+    def test_rebuild_timelines_command(self):
+        """Команда восстанавливает потерянные записи ленты."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        TimelineEntry.objects.all().delete()
+        call_command('rebuild_timelines', stdout=StringIO())
+        self.assertEqual(self.feed(), [self.old_post])
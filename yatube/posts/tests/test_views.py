@@ -2,14 +2,20 @@ import shutil
 import tempfile
 
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase, override_settings
+from django.test import (
+    Client, TestCase, TransactionTestCase, override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.cache import cache
 from django.urls import reverse
 from django import forms
 from django.conf import settings
 
-from posts.models import Post, Group, Follow
+from posts import cache as feed_cache
+from posts.models import Comment, Post, Group, Follow
+from posts.paginator import CursorPaginator
 
 User = get_user_model()
 NUMBER_OF_POST_FOR_TEST = 3
@@ -54,6 +60,9 @@ class PostPagesTests(TestCase):
         super().tearDownClass()
         shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
 
+    def setUp(self):
+        cache.clear()
+
     def test_views_uses_correct_template(self):
         """URL uses correct template."""
         templates_url_names = {
@@ -152,26 +161,18 @@ class PostPagesTests(TestCase):
                 form_field = response.context['form'].fields[value]
                 self.assertIsInstance(form_field, expected)
 
-    def test_index_cache_show_correct_context(self):
-        """Кэш шаблона create_post сформирован с правильным контекстом."""
-        post = Post.objects.create(
-            author=self.user,
-            text='test-text',
-            group=self.group
-        )
-        response_1 = self.authorized_client.get(
-            reverse('posts:index')
-        )
-        post.delete()
-        response_2 = self.authorized_client.get(
-            reverse('posts:index')
-        )
-        self.assertEqual(response_1.content, response_2.content)
-        cache.clear()
-        response_3 = self.authorized_client.get(
-            reverse('posts:index')
-        )
-        self.assertNotEqual(response_1.content, response_3.content)
+    def test_index_cache_is_page_aware(self):
+        """Кэш index различает страницы и не зависит от пользователя."""
+        for number in range(settings.NUMBER_OF_POST_PER_PAGE):
+            Post.objects.create(author=self.user, text=f'page-{number}')
+        url = reverse('posts:index')
+        first = self.client.get(url)
+        cursor = first.context['page_obj'].paginator.next_cursor
+        second = self.client.get(url, {'cursor': cursor})
+        self.assertNotEqual(first.content, second.content)
+        self.assertContains(second, self.post.text)
+        self.assertContains(self.authorized_client.get(url), 'Все авторы')
+        self.assertNotContains(self.client.get(url), 'Все авторы')
 
     def test_user_can_follow(self):
         '''Авторизованный пользователь может подписываться
@@ -227,6 +228,41 @@ class PostPagesTests(TestCase):
         self.assertEqual(context_count, 0)
 
 
+class IndexCacheTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='kirill')
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.group = Group.objects.create(
+            title='test-title',
+            slug='test-slug',
+            description='test-description',
+        )
+        Post.objects.create(author=self.user, text='test-post')
+
+    def test_index_cache_show_correct_context(self):
+        """Страница index отдаётся из кэша, пока посты не менялись."""
+        url = reverse('posts:index')
+        response_1 = self.authorized_client.get(url)
+        hits = feed_cache.get_stats('index')['hits']
+        response_2 = self.authorized_client.get(url)
+        self.assertEqual(response_1.content, response_2.content)
+        self.assertEqual(feed_cache.get_stats('index')['hits'], hits + 1)
+
+        post = Post.objects.create(
+            author=self.user,
+            text='test-cache-text',
+            group=self.group
+        )
+        response_3 = self.authorized_client.get(url)
+        self.assertContains(response_3, post.text)
+        post.delete()
+        response_4 = self.authorized_client.get(url)
+        self.assertNotContains(response_4, post.text)
+        self.assertEqual(response_1.content, response_4.content)
+
+
 class PaginatorViewsTest(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -248,19 +284,24 @@ class PaginatorViewsTest(TestCase):
                 group=cls.group,
             )
 
+    def get_second_page(self, url):
+        response = self.client.get(url)
+        cursor = response.context['page_obj'].paginator.next_cursor
+        return self.client.get(url, {'cursor': cursor})
+
     """Проверка пагинатора шаблона index.html"""
-    def test_first_page_contains_ten_records(self):
+    def test_index_first_page_contains_ten_records(self):
         response = self.client.get(reverse('posts:index'))
         self.assertEqual(len(response.context['page_obj']),
                          settings.NUMBER_OF_POST_PER_PAGE)
 
-    def test_second_page_contains_three_records(self):
-        response = self.client.get(reverse('posts:index') + '?page=2')
+    def test_index_second_page_contains_three_records(self):
+        response = self.get_second_page(reverse('posts:index'))
         self.assertEqual(len(response.context['page_obj']),
                          NUMBER_OF_POST_FOR_TEST)
 
     """Проверка пагинатора шаблона group_list.html"""
-    def test_first_page_contains_ten_records(self):
+    def test_group_first_page_contains_ten_records(self):
         response = self.client.get(
             reverse('posts:group_list',
                     kwargs={'slug': self.group.slug})
@@ -268,26 +309,155 @@ class PaginatorViewsTest(TestCase):
         self.assertEqual(len(response.context['page_obj']),
                          settings.NUMBER_OF_POST_PER_PAGE)
 
-    def test_second_page_contains_three_records(self):
-        response = self.client.get(
+    def test_group_second_page_contains_three_records(self):
+        response = self.get_second_page(
             reverse('posts:group_list',
-                    kwargs={'slug': self.group.slug}) + '?page=2'
+                    kwargs={'slug': self.group.slug})
         )
         self.assertEqual(len(response.context['page_obj']),
                          NUMBER_OF_POST_FOR_TEST)
 
     """Проверка пагинатора шаблона profile.html"""
-    def test_first_page_contains_ten_records(self):
+    def test_profile_first_page_contains_ten_records(self):
         response = self.client.get(
             reverse('posts:profile', kwargs={'username': self.user})
         )
         self.assertEqual(len(response.context['page_obj']),
                          settings.NUMBER_OF_POST_PER_PAGE)
 
-    def test_second_page_contains_three_records(self):
-        response = self.client.get(
-            reverse('posts:profile',
-                    kwargs={'username': self.user}) + '?page=2'
+    def test_profile_second_page_contains_three_records(self):
+        response = self.get_second_page(
+            reverse('posts:profile', kwargs={'username': self.user})
         )
         self.assertEqual(len(response.context['page_obj']),
                          NUMBER_OF_POST_FOR_TEST)
+
+    def test_previous_cursor_returns_first_page(self):
+        """Курсор «Предыдущая» возвращает первую страницу целиком."""
+        url = reverse('posts:index')
+        first_page = list(self.client.get(url).context['page_obj'])
+        second_page = self.get_second_page(url).context['page_obj']
+        self.assertFalse(second_page.has_next())
+        response = self.client.get(
+            url, {'cursor': second_page.paginator.previous_cursor}
+        )
+        self.assertEqual(list(response.context['page_obj']), first_page)
+        self.assertFalse(response.context['page_obj'].has_previous())
+
+    def test_pages_do_not_overlap(self):
+        """Записи не повторяются и не теряются между страницами."""
+        url = reverse('posts:index')
+        first_page = list(self.client.get(url).context['page_obj'])
+        second_page = list(self.get_second_page(url).context['page_obj'])
+        expected = list(Post.objects.order_by('-pub_date', '-pk'))
+        self.assertEqual(first_page + second_page, expected)
+
+    def test_previous_cursor_from_deep_page(self):
+        """С третьей страницы курсор «Предыдущая» ведёт на вторую."""
+        def page(cursor):
+            paginator = CursorPaginator(Post.objects.all(), 5)
+            return paginator.get_page(cursor)
+
+        second = page(page(None).paginator.next_cursor)
+        third = page(second.paginator.next_cursor)
+        self.assertEqual(third.number, 3)
+        self.assertFalse(third.has_next())
+        back = page(third.paginator.previous_cursor)
+        self.assertEqual(list(back), list(second))
+        self.assertEqual(back.number, 2)
+        self.assertTrue(back.has_next())
+
+    def test_broken_cursor_shows_first_page(self):
+        """Испорченный курсор не ломает страницу."""
+        for cursor in ('garbage', 'WyJuIiwgMiwgWzFdLCAyXQ', ''):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(
+                    reverse('posts:index'), {'cursor': cursor}
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.context['page_obj']),
+                                 settings.NUMBER_OF_POST_PER_PAGE)
+
+    def test_feed_does_not_count_posts(self):
+        """Лента не выполняет COUNT(*) и OFFSET по таблице постов."""
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.get_second_page(reverse('posts:index'))
+        for query in queries.captured_queries:
+            self.assertNotIn('COUNT(', query['sql'])
+            self.assertNotIn('OFFSET', query['sql'])
+
+
+class QueryBudgetTest(TestCase):
+    """Число запросов страницы не зависит от числа постов
+    и комментариев на ней."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='test-title',
+            slug='test-slug',
+            description='test-description',
+        )
+        cls.reader = User.objects.create_user(username='reader')
+        cls.authors = [
+            User.objects.create_user(username=f'author-{number}')
+            for number in range(3)
+        ]
+        for author in cls.authors:
+            Follow.objects.create(user=cls.reader, author=author)
+            for number in range(4):
+                cls.post = Post.objects.create(
+                    author=author, group=cls.group, text=f'post-{number}'
+                )
+                Comment.objects.create(
+                    post=cls.post, author=cls.reader, text='comment'
+                )
+        cls.author = cls.authors[-1]
+        for author in cls.authors:
+            Comment.objects.create(
+                post=cls.post, author=author, text='comment'
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+
+    def test_anonymous_pages_query_budget(self):
+        budgets = {
+            # Страница ленты.
+            reverse('posts:index'): 1,
+            # Группа и страница ленты.
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}): 2,
+            # Валидатор ETag, автор со счётчиками и страница ленты.
+            reverse('posts:profile', kwargs={'username': self.author}): 3,
+            # Валидатор ETag, пост с автором и группой,
+            # комментарии с авторами.
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}): 3,
+        }
+        for url, budget in budgets.items():
+            with self.subTest(url=url), self.assertNumQueries(budget):
+                self.client.get(url)
+
+    def test_follow_index_query_budget(self):
+        # Сессия, пользователь, число подписок, страница ленты
+        # и блок рекомендаций.
+        with self.assertNumQueries(5):
+            self.authorized_client.get(reverse('posts:follow_index'))
+
+    def test_cached_index_does_not_query_posts(self):
+        self.client.get(reverse('posts:index'))
+        with self.assertNumQueries(0):
+            self.client.get(reverse('posts:index'))
+
+    def test_post_detail_shows_comments_and_posts_count(self):
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        )
+        post = response.context['page_obj']
+        self.assertEqual(post.author.stats.posts_count, 4)
+        self.assertEqual(post.comments_count, 4)
+        self.assertEqual(len(response.context['comments']), 4)
+        self.assertContains(response, self.authors[0].username)
@@ -0,0 +1,185 @@
+"""Предварительная генерация миниатюр картинок постов.
+
+Шаблоны не ресайзят картинки: picture() отдаёт только уже готовые
+миниатюры, а вместо отсутствующих возвращает исходную картинку и ставит
+генерацию в фоновый пул из THUMBNAIL_WORKERS потоков.
+Без пула (THUMBNAIL_WORKERS = 0) очередь запроса разбирается после
+отправки ответа, по сигналу request_finished. Генерация ставится сразу
+после сохранения поста (post_create/post_edit) и командой warm_thumbnails.
+
+Каждая картинка нарезается на несколько ширин в современных форматах
+(WebP, AVIF — если их умеет Pillow) и в JPEG для старых браузеров;
+шаблон выводит их через <picture> и srcset. Список готовых вариантов
+картинки generate кладёт в кэш одной записью, и шаблон читает его
+одним запросом вместо поиска каждого варианта в kvstore.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import request_finished, request_started
+from django.db import connections, transaction
+from django.dispatch import receiver
+from PIL import Image
+from sorl.thumbnail.base import EXTENSIONS, ThumbnailBackend
+
+logger = logging.getLogger(__name__)
+
+# Ширины вариантов; пропорции сохраняются от прежнего кадра 960x339.
+WIDTHS = (320, 640, 960)
+HEIGHT_RATIO = 339 / 960
+SIZES = '(max-width: 960px) 100vw, 960px'
+VARIANTS_KEY = 'thumbnails:{name}'
+FALLBACK_FORMAT = 'JPEG'
+MIME_TYPES = {
+    'AVIF': 'image/avif',
+    'WEBP': 'image/webp',
+    'JPEG': 'image/jpeg',
+}
+# sorl не знает расширения AVIF, хотя Pillow с плагином умеет его писать.
+EXTENSIONS.setdefault('AVIF', 'avif')
+
+
+def _modern_formats():
+    Image.init()
+    return tuple(name for name in ('AVIF', 'WEBP') if name in Image.SAVE)
+
+
+# Порядок важен: браузер берёт первый поддерживаемый <source>.
+FORMATS = _modern_formats() + (FALLBACK_FORMAT,)
+
+
+def geometry(width):
+    return f'{width}x{round(width * HEIGHT_RATIO)}'
+
+
+def options(format_):
+    return {'crop': 'center', 'upscale': True, 'format': format_}
+
+
+# Геометрии, которые запрашивают шаблоны лент и страницы поста.
+GEOMETRIES = tuple(
+    (geometry(width), options(format_))
+    for format_ in FORMATS
+    for width in WIDTHS
+)
+
+_executor = None
+_pending = set()
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.THUMBNAIL_WORKERS,
+                thread_name_prefix='thumbnails',
+            )
+    return _executor
+
+
+def variants_key(image_name):
+    return VARIANTS_KEY.format(name=image_name)
+
+
+def generate(image_name):
+    """Синхронно создаёт все миниатюры картинки и запоминает их адреса."""
+    backend = ThumbnailBackend()
+    variants = {
+        format_: [
+            (backend.get_thumbnail(
+                image_name, geometry(width), **options(format_)
+            ).url, width)
+            for width in WIDTHS
+        ]
+        for format_ in FORMATS
+    }
+    cache.set(variants_key(image_name), variants, None)
+
+
+def _generate_safely(image_name):
+    try:
+        generate(image_name)
+    except Exception:
+        logger.exception('Не удалось создать миниатюры %s', image_name)
+
+
+def _generate_in_worker(image_name):
+    try:
+        _generate_safely(image_name)
+    finally:
+        with _lock:
+            _pending.discard(image_name)
+        connections.close_all()
+
+
+@receiver(request_started)
+def _start_queue(**kwargs):
+    _local.queue = []
+
+
+@receiver(request_finished)
+def _drain_queue(**kwargs):
+    """Создаёт миниатюры, запрошенные за время запроса, уже после ответа."""
+    queue, _local.queue = getattr(_local, 'queue', None), None
+    for image_name in dict.fromkeys(queue or ()):
+        _generate_safely(image_name)
+
+
+def _submit(image_name):
+    if not settings.THUMBNAIL_WORKERS:
+        queue = getattr(_local, 'queue', None)
+        if queue is None:
+            # Вне запроса (команды, shell) ждать некого.
+            _generate_safely(image_name)
+        else:
+            queue.append(image_name)
+        return
+    with _lock:
+        if image_name in _pending:
+            return
+        _pending.add(image_name)
+    get_executor().submit(_generate_in_worker, image_name)
+
+
+def schedule(image_name):
+    """Ставит генерацию миниатюр в пул после фиксации транзакции."""
+    if image_name:
+        transaction.on_commit(lambda: _submit(image_name))
+
+
+def picture(image):
+    """Собирает источники <picture> из уже готовых вариантов картинки.
+
+    Пока варианты не созданы (или их список вытеснен из кэша), шаблон
+    получает исходную картинку, а генерация ставится в очередь.
+    """
+    variants = cache.get(variants_key(image.name))
+    if variants is None:
+        schedule(image.name)
+        variants = {}
+    sources = []
+    for format_ in FORMATS:
+        candidates = variants.get(format_)
+        if candidates:
+            sources.append({
+                'type': MIME_TYPES[format_],
+                'srcset': ', '.join(
+                    f'{url} {width}w' for url, width in candidates
+                ),
+                'src': candidates[-1][0],
+            })
+    fallback = {'src': image.url, 'srcset': ''}
+    if sources and sources[-1]['type'] == MIME_TYPES[FALLBACK_FORMAT]:
+        fallback = sources.pop()
+    return {
+        'sources': sources,
+        'src': fallback['src'],
+        'srcset': fallback['srcset'],
+        'sizes': SIZES,
+    }
@@ -0,0 +1,117 @@
+"""Материализованная лента подписок (fan-out on write).
+
+Новый пост раскладывается в ленты всех подписчиков автора, подписка
+догружает в ленту посты автора, отписка их вычищает. Для читателей,
+подписанных на слишком многих авторов, лента не ведётся: их страница
+«Избранные авторы» строится соединением с Follow, как раньше.
+"""
+from itertools import islice
+
+from django.conf import settings
+
+from .models import Follow, Post, TimelineEntry, UserStats
+from .paginator import CursorPaginator
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _insert(entries):
+    for batch in _batches(entries, settings.TIMELINE_BATCH_SIZE):
+        TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def following_count(user):
+    """Число подписок читателя по денормализованному счётчику."""
+    following = UserStats.objects.filter(user=user).values_list(
+        'following_count', flat=True).first()
+    return following or 0
+
+
+def is_materialized(user):
+    """Ведётся ли для читателя материализованная лента."""
+    if not settings.TIMELINE_ENABLED:
+        return False
+    return following_count(user) <= settings.TIMELINE_MAX_FOLLOWING
+
+
+def fan_out(post):
+    """Кладёт новый пост в материализованные ленты подписчиков автора.
+
+    Читателям сверх TIMELINE_MAX_FOLLOWING лента не ведётся, и записи
+    для них были бы мёртвым грузом.
+    """
+    followers = Follow.objects.filter(
+        author_id=post.author_id,
+        user__stats__following_count__lte=settings.TIMELINE_MAX_FOLLOWING,
+    ).values_list('user_id', flat=True)
+    _insert(
+        TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+        for user_id in followers.iterator()
+    )
+
+
+def backfill(user_id, author_ids):
+    """Догружает в ленту читателя уже опубликованные посты авторов."""
+    posts = Post.objects.filter(author_id__in=author_ids)
+    _insert(
+        TimelineEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+        for post_id, pub_date in posts.values_list(
+            'pk', 'pub_date').iterator()
+    )
+
+
+def prune(user_id, author_id):
+    """Убирает посты автора из ленты читателя."""
+    TimelineEntry.objects.filter(
+        user_id=user_id, post__author_id=author_id
+    ).delete()
+
+
+def rebuild(user_id):
+    """Пересобирает ленту читателя с нуля по его подпискам."""
+    TimelineEntry.objects.filter(user_id=user_id).delete()
+    authors = Follow.objects.filter(user_id=user_id).values_list(
+        'author_id', flat=True)
+    backfill(user_id, authors)
+
+
+def rebuild_many(user_ids=None):
+    """Пересобирает ленты читателей (по умолчанию всех, у кого есть
+    подписки); большие ленты пропускает. Возвращает (собрано, пропущено).
+    """
+    if user_ids is None:
+        user_ids = Follow.objects.values_list(
+            'user_id', flat=True).distinct().iterator()
+    rebuilt = skipped = 0
+    for user_id in user_ids:
+        if is_materialized(user_id):
+            rebuild(user_id)
+            rebuilt += 1
+        else:
+            skipped += 1
+    return rebuilt, skipped
+
+
+class TimelinePaginator(CursorPaginator):
+    """Листает записи ленты, а на страницу отдаёт сами посты."""
+
+    def transform(self, rows):
+        return [entry.post for entry in rows]
+
+
+def follow_feed(user):
+    """Возвращает queryset ленты подписок и класс пагинатора для него."""
+    if is_materialized(user):
+        entries = TimelineEntry.objects.filter(user=user).select_related(
+            'post__author', 'post__group')
+        return entries, TimelinePaginator
+    post_list = Post.objects.filter(
+        author__following__user=user).select_related('author', 'group')
+    return post_list, CursorPaginator
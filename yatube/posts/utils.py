@@ -0,0 +1,22 @@
+from django.conf import settings
+
+from .models import Comment
+from .paginator import CursorPaginator
+
+
+def paginate(request, queryset, paginator_class=CursorPaginator, **kwargs):
+    """Возвращает страницу ленты по параметру ?cursor= запроса."""
+    paginator = paginator_class(
+        queryset, settings.NUMBER_OF_POST_PER_PAGE, **kwargs
+    )
+    return paginator.get_page(request.GET.get('cursor'))
+
+
+def comment_page(post_id, cursor):
+    """Страница комментариев поста по ключу (created, pk)."""
+    comments = Comment.objects.filter(post_id=post_id).select_related(
+        'author')
+    paginator = CursorPaginator(
+        comments, settings.COMMENTS_PER_PAGE, ordering=('created', 'pk')
+    )
+    return paginator.get_page(cursor)
@@ -1,17 +1,28 @@
+import json
+
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
-from django.conf import settings
+from django.db.models import F
+from django.http import Http404, JsonResponse
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import condition, require_POST
 
 from .models import Post, Group, Follow, User
 from .forms import PostForm, CommentForm
+from core.routers import use_primary
 
+from . import (
+    cache, conditional, counters, follows, search, suggestions, thumbnails,
+    timeline,
+)
+from .utils import comment_page, paginate
 
+
+@conditional.feed_condition(conditional.feed_etag)
 def index(request):
-    post_list = Post.objects.all().order_by('-pub_date')
-    paginator = Paginator(post_list, settings.NUMBER_OF_POST_PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    post_list = Post.objects.select_related('author', 'group')
+    page_obj = paginate(request, post_list)
 
     template = 'posts/index.html'
     context = {
@@ -20,13 +31,29 @@ def index(request):
     return render(request, template, context)
 
 
-def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    post_list = Post.objects.filter(group=group).order_by('-pub_date')[:10]
+def post_search(request):
+    query = request.GET.get('q', '').strip()
+    post_list = search.ranked(
+        Post.objects.select_related('author', 'group'), query
+    )
+    page_obj = paginate(request, post_list, search.SearchPaginator)
+
+    template = 'posts/search.html'
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+    }
+    return render(request, template, context)
 
-    paginator = Paginator(post_list, settings.NUMBER_OF_POST_PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+
+@conditional.feed_condition(conditional.feed_etag)
+def group_posts(request, slug):
+    group = cache.get_group(slug)
+    if group is None:
+        raise Http404
+    post_list = Post.objects.filter(group=group).select_related(
+        'author', 'group')
+    page_obj = paginate(request, post_list)
 
     template = 'posts/group_list.html'
     context = {
@@ -37,14 +64,39 @@ def group_posts(request, slug):
     return render(request, template, context)
 
 
-def profile(request, username):
-    profile_user = get_object_or_404(User, username=username)
-    posts_list = Post.objects.filter(author=profile_user).order_by('-pub_date')
-    posts_count = posts_list.count()
+def group_index(request):
+    # Запрос выполняется только при промахе кэша справочника.
+    groups = Group.objects.order_by(
+        F('last_post_at').desc(nulls_last=True), 'title'
+    )
+
+    template = 'posts/groups.html'
+    context = {
+        'groups': groups,
+        'directory_name': cache.GROUP_DIRECTORY,
+    }
+    return render(request, template, context)
+
+
+def _suggestions_context(request):
+    # Запрос рекомендаций выполняется только при промахе кэша блока.
+    if not request.user.is_authenticated:
+        return {}
+    return {
+        'suggestions': suggestions.for_user(request.user),
+        'suggestions_name': cache.suggestions_feed_name(request.user.pk),
+    }
+
 
-    paginator = Paginator(posts_list, settings.NUMBER_OF_POST_PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+@conditional.feed_condition(conditional.profile_etag)
+def profile(request, username):
+    profile_user = get_object_or_404(
+        User.objects.select_related('stats'), username=username
+    )
+    posts_list = Post.objects.filter(author=profile_user).select_related(
+        'author', 'group')
+    stats = counters.get_stats(profile_user)
+    page_obj = paginate(request, posts_list)
 
     follow_flag = False
     if ((request.user != profile_user)
@@ -57,25 +109,61 @@ def profile(request, username):
     context = {
         'profile_user': profile_user,
         'page_obj': page_obj,
-        'posts_count': posts_count,
+        'posts_count': stats.posts_count,
+        'stats': stats,
         'following': follow_flag,
+        **_suggestions_context(request),
     }
     return render(request, template, context)
 
 
+@condition(
+    etag_func=conditional.post_etag,
+    last_modified_func=conditional.post_last_modified,
+)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post_list = Post.objects.select_related('author__stats', 'group')
+    post = get_object_or_404(post_list, pk=post_id)
     form = CommentForm(None)
 
     template = 'posts/post_detail.html'
     context = {
         'page_obj': post,
         'form': form,
+        'comments': comment_page(post.pk, request.GET.get('comments')),
+    }
+    return render(request, template, context)
+
+
+def comment_list(request, post_id):
+    """Следующие страницы комментариев: HTML-фрагмент или ?format=json."""
+    if not Post.objects.filter(pk=post_id).exists():
+        raise Http404
+    comments = comment_page(post_id, request.GET.get('cursor'))
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'comments': [
+                {
+                    'id': comment.pk,
+                    'author': comment.author.username,
+                    'text': comment.text,
+                    'created': comment.created.isoformat(),
+                }
+                for comment in comments
+            ],
+            'next_cursor': comments.paginator.next_cursor,
+        })
+
+    template = 'posts/includes/comment_list.html'
+    context = {
+        'post_id': post_id,
+        'comments': comments,
     }
     return render(request, template, context)
 
 
 @login_required
+@use_primary
 def post_create(request):
     template = 'posts/create_post.html'
     form = PostForm(request.POST or None,
@@ -90,9 +178,11 @@ def post_create(request):
     post = form.save(commit=False)
     post.author = request.user
     post.save()
+    thumbnails.schedule(post.image.name)
     return redirect('posts:profile', username=request.user.username)
 
 
+@use_primary
 def post_edit(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
     if post.author != request.user:
@@ -111,10 +201,13 @@ def post_edit(request, post_id):
         return render(request, template, context)
 
     post.save()
+    if 'image' in form.changed_data:
+        thumbnails.schedule(post.image.name)
     return redirect('posts:post_detail', post_id=post_id)
 
 
 @login_required
+@use_primary
 def add_comment(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
     form = CommentForm(request.POST or None)
@@ -128,33 +221,87 @@ def add_comment(request, post_id):
 
 @login_required
 def follow_index(request):
-    post_list = Post.objects.filter(
-        author__following__user=request.user
-    ).order_by('-pub_date')
-    paginator = Paginator(post_list, settings.NUMBER_OF_POST_PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    post_list, paginator_class = timeline.follow_feed(request.user)
+    page_obj = paginate(request, post_list, paginator_class)
 
     template = 'posts/follow.html'
     context = {
         'page_obj': page_obj,
+        'feed_name': cache.follow_feed_name(request.user.pk),
+        **_suggestions_context(request),
     }
     return render(request, template, context)
 
 
+def _wants_json(request):
+    return (
+        request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+        or 'application/json' in request.headers.get('Accept', '')
+    )
+
+
+def _follow_response(request, author, following):
+    if _wants_json(request):
+        response = JsonResponse({
+            'following': following,
+            'followers_count': counters.get_stats(author).followers_count,
+        })
+    else:
+        response = redirect('posts:profile', username=author.username)
+    # Ответ зависит от заголовков: кэш не должен отдать JSON ссылке.
+    patch_vary_headers(response, ('Accept', 'X-Requested-With'))
+    return response
+
+
 @login_required
+@use_primary
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
-    if request.user != author:
-        Follow.objects.get_or_create(
-            user=request.user,
-            author=author
-        )
-    return redirect('posts:profile', username=username)
+    follows.follow(request.user, author)
+    return _follow_response(request, author, request.user != author)
 
 
 @login_required
+@use_primary
 def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
-    Follow.objects.filter(user=request.user, author=author).delete()
-    return redirect('posts:profile', username=username)
+    follows.unfollow(request.user, author)
+    return _follow_response(request, author, False)
+
+
+@login_required
+@use_primary
+@require_POST
+def follow_bulk(request):
+    """Подписки и отписки пачкой: {"follow": [...], "unfollow": [...]}."""
+    try:
+        payload = json.loads(request.body)
+        to_follow = payload.get('follow', [])
+        to_unfollow = payload.get('unfollow', [])
+    except (AttributeError, ValueError):
+        to_follow = to_unfollow = None
+    # Строку list() разобрал бы на буквы, поэтому только списки.
+    if not (isinstance(to_follow, list) and isinstance(to_unfollow, list)
+            and all(isinstance(name, str)
+                    for name in to_follow + to_unfollow)):
+        return JsonResponse(
+            {'error': 'Ожидаются списки имён follow и unfollow'}, status=400
+        )
+    if len(to_follow) + len(to_unfollow) > settings.BULK_FOLLOW_LIMIT:
+        return JsonResponse(
+            {'error': f'Не больше {settings.BULK_FOLLOW_LIMIT} авторов'},
+            status=400,
+        )
+    ids = follows.resolve(to_follow + to_unfollow)
+    user_id = request.user.pk
+    followed = follows.follow_many(
+        user_id, [ids[name] for name in to_follow if name in ids]
+    )
+    unfollowed = follows.unfollow_many(
+        user_id, [ids[name] for name in to_unfollow if name in ids]
+    )
+    return JsonResponse({
+        'followed': followed,
+        'unfollowed': unfollowed,
+        'unknown': sorted(set(to_follow + to_unfollow) - ids.keys()),
+    })
@@ -0,0 +1,277 @@
+"""
+Django settings for yatube project.
+
+Общие настройки окружений; профили лежат рядом: dev (по умолчанию,
+его импортирует пакет yatube.settings) и prod.
+
+Generated by 'django-admin startproject' using Django 2.2.19.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/2.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/2.2/ref/settings/
+"""
+
+import os
+
+# Build paths inside the project like this: os.path.join(BASE_DIR, ...)
+BASE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+NUMBER_OF_POST_PER_PAGE = 10
+COMMENTS_PER_PAGE = 20
+# Сколько авторов можно передать в один запрос posts:follow_bulk.
+BULK_FOLLOW_LIMIT = 100
+# Сколько рекомендаций «на кого подписаться» хранится и показывается.
+FOLLOW_SUGGESTIONS_LIMIT = 5
+
+# Админка: с какого размера таблицы список берёт оценку числа строк
+# вместо COUNT(*), и сколько строк обрабатывает за раз массовое действие.
+ADMIN_ESTIMATED_COUNT_THRESHOLD = 100000
+ADMIN_ACTION_CHUNK_SIZE = 1000
+
+# Материализованная лента подписок (posts.timeline).
+TIMELINE_ENABLED = True
+# Читатели с большим числом подписок читают ленту через соединение с Follow.
+TIMELINE_MAX_FOLLOWING = 500
+TIMELINE_BATCH_SIZE = 1000
+
+# Страницы лент инвалидируются версией (posts.cache), поэтому живут долго.
+FEED_CACHE_TIMEOUT = 60 * 60
+# Защита от лавины перерисовок: сколько живёт блокировка перерисовки
+# и сколько секунд процесс без прежней версии ждёт чужой рендер.
+FEED_CACHE_LOCK_TIMEOUT = 10
+FEED_CACHE_LOCK_WAIT = 1.0
+# Ленты подписчиков автора инвалидируются пачками такого размера.
+FEED_INVALIDATION_BATCH_SIZE = 1000
+
+# Бэкенд кэша выбирается переменной CACHE_BACKEND; профили задают свой
+# по умолчанию. Для db нужна таблица: manage.py createcachetable.
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', '', {}),
+    # Файловый кэш с атомарными add и incr, на которых держатся
+    # блокировки и счётчики лент. Каждая запись — файл, а чистка
+    # перебирает весь каталог, поэтому предел задан явно: при его
+    # достижении удаляется треть записей.
+    'file': (
+        'core.cache.FileBasedCache',
+        '/var/tmp/yatube_cache',
+        {'MAX_ENTRIES': 50000, 'CULL_FREQUENCY': 3},
+    ),
+    'db': (
+        'django.core.cache.backends.db.DatabaseCache', 'yatube_cache', {},
+    ),
+    'memcached': (
+        'django.core.cache.backends.memcached.MemcachedCache',
+        '127.0.0.1:11211',
+        {},
+    ),
+}
+
+
+def cache_settings(default):
+    backend, location, options = CACHE_BACKENDS[
+        os.environ.get('CACHE_BACKEND', default)
+    ]
+    return {
+        'default': {
+            'BACKEND': backend,
+            'LOCATION': os.environ.get('CACHE_LOCATION', location),
+            'OPTIONS': options,
+        }
+    }
+
+
+CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = 'hb(+a(3k24gil_jqojnxty1gewt$_^1!fm)403n0qs61cyl*!='
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = False
+
+
+ALLOWED_HOSTS = [
+    'localhost',
+    '127.0.0.1',
+    '[::1]',
+    'testserver',
+    'www.kirillka06.pythonanywhere.com',
+    'kirillka06.pythonanywhere.com',
+]
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'about.apps.AboutConfig',
+    'core.apps.CoreConfig',
+    'users.apps.UsersConfig',
+    'posts.apps.PostsConfig',
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'sorl.thumbnail',
+]
+
+MIDDLEWARE = [
+    # Снаружи всех, чтобы замер покрывал весь запрос.
+    'core.middleware.PerformanceMiddleware',
+    # Первым, чтобы чтение сессии и пользователя тоже шло по маршруту.
+    'core.middleware.ReplicaRoutingMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'yatube.urls'
+
+# Метрики запросов (core.middleware.PerformanceMiddleware).
+PERFORMANCE_ENABLED = os.environ.get('PERFORMANCE_ENABLED', '1') == '1'
+PERFORMANCE_SERVER_TIMING = True
+# Доля запросов, которые пишутся в лог; медленные пишутся всегда.
+PERFORMANCE_SAMPLE_RATE = float(os.environ.get('PERFORMANCE_SAMPLE_RATE', 0))
+PERFORMANCE_SLOW_MS = float(os.environ.get('PERFORMANCE_SLOW_MS', 1000))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'yatube.performance': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+TEMPLATES = [
+    {
+        'BACKEND': 'core.template_backends.TimedDjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'core.context_processors.year.year',
+            ],
+        },
+    },
+]
+
+# Компилировать все шаблоны при старте (core.warmup); имеет смысл
+# только с кэширующим загрузчиком, см. yatube.settings.prod.
+TEMPLATE_WARMUP = False
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/2.2/ref/settings/#databases
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get(
+            'SQLITE_PATH', os.path.join(BASE_DIR, 'db.sqlite3')
+        ),
+        # Соединения переиспользуются между запросами одного потока.
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+    }
+}
+
+# Реплики для чтения, см. core.routers. Локально реплику изображает
+# второй файл SQLite, который наполняет команда sync_replica.
+DATABASE_REPLICAS = []
+if os.environ.get('SQLITE_REPLICA_PATH'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ['SQLITE_REPLICA_PATH'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS = ['replica']
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+# Сколько секунд после записи клиент читает из основной базы.
+REPLICA_STICKY_SECONDS = 5
+
+# PRAGMA, которые core.db применяет к каждому новому соединению SQLite.
+SQLITE_PRAGMAS = {
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    # Отрицательное значение задаёт размер кэша страниц в КиБ.
+    'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -64 * 1024)),
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 20 * 1000)),
+    'temp_store': os.environ.get('SQLITE_TEMP_STORE', 'MEMORY'),
+}
+
+
+# Password validation
+# https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/2.2/topics/i18n/
+
+LANGUAGE_CODE = 'en-us'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/2.2/howto/static-files/
+
+STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
+STATIC_URL = '/static/'
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Потоки фоновой генерации миниатюр; 0 — в том же процессе
+# после отправки ответа.
+THUMBNAIL_WORKERS = int(os.environ.get('THUMBNAIL_WORKERS', 2))
+
+LOGIN_URL = 'users:login'
+LOGIN_REDIRECT_URL = 'posts:index'
+# при выходе из аккаунта пользователи будут перенаправляться на главную страницу проекта.
+# LOGOUT_REDIRECT_URL = 'posts:index'
@@ -0,0 +1,18 @@
+"""Настройки для локальной разработки и тестов."""
+from .base import *  # noqa: F401, F403
+from .base import INSTALLED_APPS, MIDDLEWARE, cache_settings
+
+DEBUG = True
+
+INTERNAL_IPS = [
+    '127.0.0.1',
+]
+
+INSTALLED_APPS = INSTALLED_APPS + ['debug_toolbar']
+MIDDLEWARE = MIDDLEWARE + ['debug_toolbar.middleware.DebugToolbarMiddleware']
+
+CACHES = cache_settings('locmem')
+
+# Миниатюры создаются после ответа в том же процессе: фоновые потоки
+# дописывали бы их во временный MEDIA_ROOT тестов уже после его удаления.
+THUMBNAIL_WORKERS = 0
@@ -0,0 +1,30 @@
+"""Настройки боевого окружения."""
+import copy
+
+from .base import *  # noqa: F401, F403
+from .base import DATABASE_REPLICAS, MIDDLEWARE, TEMPLATES, cache_settings
+
+DEBUG = False
+
+# Общий для всех процессов кэш; файловый работает без внешних сервисов.
+CACHES = cache_settings('file')
+
+# Без реплик маршрутизация чтения ничего не делает: роутер и так
+# отправляет всё в основную базу.
+if not DATABASE_REPLICAS:
+    MIDDLEWARE = [
+        name for name in MIDDLEWARE
+        if name != 'core.middleware.ReplicaRoutingMiddleware'
+    ]
+
+# Кэширующий загрузчик не перечитывает шаблоны с диска на каждый
+# рендер. С явными loaders APP_DIRS должен быть выключен.
+TEMPLATES = copy.deepcopy(TEMPLATES)
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+TEMPLATE_WARMUP = True